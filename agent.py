@@ -1,9 +1,105 @@
+import io
 import json
-import yaml
-from openai import OpenAI
+import asyncio
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
 from tools import discover_tools
 from config_manager import ConfigurationManager, ConfigurationError
 from provider_factory import ProviderClientFactory, ProviderError, DeepSeekAPIError, OpenRouterAPIError
+from llm_cache import MemoryLRUCache, build_response, create_llm_cache, make_cache_key, _json_default
+
+# Deterministic, side-effect free tools whose results may be reused.
+# read_file is left out: files can change between calls, including between user queries
+DEFAULT_CACHEABLE_TOOLS = ("search_web", "calculate")
+
+# DeepSeek rejects an empty tools array, so a no-op tool is sent when no real tools are available
+DUMMY_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "dummy_tool",
+        "description": "A dummy tool that does nothing",
+        "parameters": {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    }
+}
+
+# Provider-specific exception raised when an LLM call fails
+PROVIDER_ERRORS = {
+    "deepseek": DeepSeekAPIError,
+    "openrouter": OpenRouterAPIError
+}
+
+# orjson is several times faster than stdlib json for tool payloads; fall back when unavailable
+try:
+    import orjson
+    
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj, sort_keys=False):
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option).decode()
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+    
+    def _json_dumps(obj, sort_keys=False):
+        return json.dumps(obj, sort_keys=sort_keys)
+
+
+class _ResponseBuffer:
+    """Accumulates assistant output separated by blank lines.
+    
+    Parts are written straight into a StringIO instead of being kept in a list
+    until the final join.
+    """
+    
+    def __init__(self):
+        self._buf = io.StringIO()
+        self._empty = True
+    
+    def append(self, text):
+        if not self._empty:
+            self._buf.write("\n\n")
+        self._buf.write(text)
+        self._empty = False
+    
+    def __bool__(self):
+        return not self._empty
+    
+    def getvalue(self):
+        return self._buf.getvalue()
+
+
+def _is_complete_json(text):
+    """Check whether streamed tool arguments form a complete JSON document"""
+    try:
+        _json_loads(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _parse_tool_arguments(tool_call):
+    """Parse a tool call's JSON arguments, returning None if they are malformed"""
+    try:
+        return _json_loads(tool_call.function.arguments)
+    except Exception:
+        return None
+
+
+def _append_completion_message(args, full_response_content):
+    """Capture the final message carried by mark_task_complete arguments"""
+    if not isinstance(args, dict):
+        return
+    if 'completion_message' in args:
+        full_response_content.append(args['completion_message'])
+    elif 'task_summary' in args:
+        full_response_content.append(args['task_summary'])
+
 
 class UniversalAgent:
     """Universal agent that works with any OpenAI-compatible provider (OpenRouter, DeepSeek, etc.)"""
@@ -20,6 +116,7 @@ class UniversalAgent:
             # Get provider configuration
             self.provider_config = self.config_manager.get_provider_config()
             self.provider_type = self.provider_config.provider_type
+            self._error_wrapper = PROVIDER_ERRORS.get(self.provider_type)
             
             # Create provider-specific client
             self.client = ProviderClientFactory.create_client(self.provider_config)
@@ -35,88 +132,312 @@ class UniversalAgent:
                 if self.model_info.get('name'):
                     print(f"📋 Model Name: {self.model_info['name']}")
             
+            # Config is fixed after load, so bind what every run needs once
+            agent_config = self.config_manager.get_agent_config()
+            self._system_message = {"role": "system", "content": self.config_manager.get_system_prompt()}
+            self._max_iterations = agent_config.get('max_iterations', 10)
+            
+            # Exact-match response cache for deterministic calls (disabled unless configured)
+            self.llm_cache = create_llm_cache(agent_config.get('cache', {}))
+            
+            # Stream completions so generation can stop once the task is marked complete
+            self.stream_responses = agent_config.get('stream', False)
+            
+            # Drop earlier assistant text from the history once a turn exceeds this many characters
+            self.content_trim_threshold = agent_config.get('content_trim_threshold')
+            
+            # Send request bodies built around pre-serialized tool schemas (requires orjson)
+            self.prebaked_requests = agent_config.get('prebaked_requests', False) and orjson is not None
+            
         except (ConfigurationError, ProviderError) as e:
             raise Exception(f"Agent initialization failed: {str(e)}")
         
+        # Async client is created lazily on the first acall_llm so sync-only
+        # callers never pay for it
+        self.async_client = None
+        
+        # Client-side rate limiting for concurrent async calls; the orchestrator
+        # replaces this with one semaphore shared by all of its agents
+        self.llm_semaphore = asyncio.Semaphore(agent_config.get('max_concurrency', 10))
+        
         # Discover tools dynamically
         self.discovered_tools = discover_tools(self.config, silent=self.silent)
         
-        # Build tools array (compatible with OpenAI format)
-        self.tools = [tool.to_openrouter_schema() for tool in self.discovered_tools.values()]
+        # Build tools array (compatible with OpenAI format) and tool mapping in one pass
+        tools = []
+        tool_mapping = {}
+        for name, tool in self.discovered_tools.items():
+            tools.append(tool.to_openrouter_schema())
+            tool_mapping[name] = tool.execute
+        self.tools = tools
+        self.tool_mapping = types.MappingProxyType(tool_mapping)
+        self.read_only_tools = frozenset(
+            name for name, tool in self.discovered_tools.items() if getattr(tool, 'read_only', False) is True
+        )
         
-        # Build tool mapping
-        self.tool_mapping = {name: tool.execute for name, tool in self.discovered_tools.items()}
+        # Tool result memoization (keyed on tool name + canonical arguments)
+        tools_config = self.config.get('tools', {})
+        self.cacheable_tools = set(tools_config.get('cacheable', DEFAULT_CACHEABLE_TOOLS))
+        self.tool_cache = MemoryLRUCache(
+            maxsize=tools_config.get('cache_maxsize', 2048),
+            ttl=tools_config.get('cache_ttl', 300)
+        )
+        self.tool_cache_stats = {}
+        # Read-only tools run in worker threads, so the counters need their own lock
+        self._tool_cache_stats_lock = threading.Lock()
     
+    @property
+    def tools(self):
+        """Tool schemas sent to the LLM"""
+        return self._tools
+    
+    @tools.setter
+    def tools(self, tools):
+        # Specialize the request payload once per assignment rather than on every call;
+        # callers such as the orchestrator replace tools after construction.
+        # Stored as a tuple so the schemas cannot be mutated behind the payload
+        tools = tuple(tools or ())
+        self._tools = tools
+        if self.provider_type == "deepseek":
+            self._tools_payload = tools or [DUMMY_TOOL]
+        else:
+            self._tools_payload = tools or None
+        # Tool schemas never change between calls, so serialize them once here
+        self._tools_json = orjson.dumps(self._tools_payload) if orjson is not None and self._tools_payload else None
+    
+    def remove_tools(self, names):
+        """Drop the named tools from both the schemas and the tool mapping in one pass"""
+        excluded = frozenset(names)
+        tools = []
+        tool_mapping = {}
+        for tool in self._tools:
+            name = tool.get('function', {}).get('name')
+            if name in excluded:
+                continue
+            tools.append(tool)
+            if name in self.tool_mapping:
+                tool_mapping[name] = self.tool_mapping[name]
+        self.tools = tools
+        self.tool_mapping = types.MappingProxyType(tool_mapping)
+    
+    def _build_api_params(self, messages):
+        """Prepare API call parameters for the current provider"""
+        api_params = {
+            "model": self.provider_config.model,
+            "messages": messages
+        }
+        if self._tools_payload:
+            api_params["tools"] = self._tools_payload
+        return api_params
+    
+    def _build_request_body(self, messages):
+        """Build the JSON request body, splicing in the pre-serialized tools.
+        
+        Only the messages (and the model, which the orchestrator may override)
+        are serialized per call.
+        """
+        body = b'{"model":' + orjson.dumps(self.provider_config.model)
+        if self._tools_json is not None:
+            body += b',"tools":' + self._tools_json
+        return body + b',"messages":' + orjson.dumps(messages, default=_json_default) + b'}'
+    
+    def _post_prebaked(self, messages):
+        """Send a chat completion request with a pre-built body through the SDK client"""
+        from openai.types.chat import ChatCompletion
+        
+        return self.client.post(
+            "/chat/completions",
+            cast_to=ChatCompletion,
+            content=self._build_request_body(messages),
+            options={"headers": {"Content-Type": "application/json"}}
+        )
+    
+    def _wrap_llm_error(self, e):
+        """Convert a provider exception into a provider-specific error.
+        
+        Hints are chosen from the SDK's exception type rather than by searching
+        the (possibly large) error text.
+        """
+        if self._error_wrapper is None:
+            return Exception(f"LLM call failed: {str(e)}")
+        
+        # Already imported by the client that raised e
+        import openai
+        
+        provider_name = self.provider_info.get('name', self.provider_type)
+        error_msg = f"{provider_name} API call failed: {str(e)}"
+        if isinstance(e, openai.AuthenticationError):
+            error_msg += f"\n💡 Check your {provider_name} API key in the configuration file"
+        elif isinstance(e, openai.RateLimitError) and self.provider_type == "deepseek":
+            error_msg += "\n💡 DeepSeek rate limit reached. Try again later or during off-peak hours (16:30-00:30 UTC)"
+        return self._error_wrapper(error_msg)
+    
+    def _get_cache_key(self, api_params):
+        """Cache key for deterministic calls, or None when the call must not be cached"""
+        if self.llm_cache is None or api_params.get("temperature", 0) != 0:
+            return None
+        return make_cache_key(api_params["model"], api_params["messages"], api_params.get("tools"))
+    
+    def _get_cached_response(self, cache_key):
+        """Look up a cached response, logging hits when not silent"""
+        if cache_key is None:
+            return None
+        response = self.llm_cache.get(cache_key)
+        if response is not None and not self.silent:
+            print(f"💾 LLM cache hit ({self.llm_cache.hits} hits / {self.llm_cache.misses} misses)")
+        return response
     
     def call_llm(self, messages):
         """Make API call with tools (works with any OpenAI-compatible provider)"""
+        api_params = self._build_api_params(messages)
+        cache_key = self._get_cache_key(api_params)
+        cached_response = self._get_cached_response(cache_key)
+        if cached_response is not None:
+            return cached_response
+        
         try:
-            # Prepare API call parameters
-            api_params = {
-                "model": self.provider_config.model,
-                "messages": messages
-            }
-            
-            # For DeepSeek, ensure tools array is never empty by adding a dummy tool if needed
-            if self.provider_type == "deepseek":
-                if self.tools:
-                    api_params["tools"] = self.tools
-                else:
-                    # Add a dummy tool for DeepSeek when no real tools are available
-                    dummy_tool = {
-                        "type": "function",
-                        "function": {
-                            "name": "dummy_tool",
-                            "description": "A dummy tool that does nothing",
-                            "parameters": {
-                                "type": "object",
-                                "properties": {},
-                                "required": []
-                            }
-                        }
-                    }
-                    api_params["tools"] = [dummy_tool]
-            elif self.tools:
-                api_params["tools"] = self.tools
-            
-            response = self.client.chat.completions.create(**api_params)
-            return response
+            if self.prebaked_requests:
+                response = self._post_prebaked(messages)
+            else:
+                response = self.client.chat.completions.create(**api_params)
         except Exception as e:
             # Provide provider-specific error messages
-            if self.provider_type == "deepseek":
-                error_msg = f"DeepSeek API call failed: {str(e)}"
-                if "api_key" in str(e).lower():
-                    error_msg += "\n💡 Check your DeepSeek API key in the configuration file"
-                elif "rate" in str(e).lower():
-                    error_msg += "\n💡 DeepSeek rate limit reached. Try again later or during off-peak hours (16:30-00:30 UTC)"
-                raise DeepSeekAPIError(error_msg)
-            elif self.provider_type == "openrouter":
-                error_msg = f"OpenRouter API call failed: {str(e)}"
-                if "api_key" in str(e).lower():
-                    error_msg += "\n💡 Check your OpenRouter API key in the configuration file"
-                raise OpenRouterAPIError(error_msg)
-            else:
-                raise Exception(f"LLM call failed: {str(e)}")
+            raise self._wrap_llm_error(e)
+        
+        if cache_key is not None:
+            self.llm_cache.set(cache_key, response)
+        return response
     
-    def handle_tool_call(self, tool_call):
-        """Handle a tool call and return the result message"""
+    def stream_llm(self, messages):
+        """Streaming variant of call_llm.
+        
+        Reassembles the assistant message from deltas. Once the mark_task_complete
+        call has complete arguments, the stream is closed at the first chunk that
+        carries no tool call, so tool calls that follow the completion call are
+        still run but no tokens are spent on text after them.
+        """
+        api_params = self._build_api_params(messages)
+        cache_key = self._get_cache_key(api_params)
+        cached_response = self._get_cached_response(cache_key)
+        if cached_response is not None:
+            return cached_response
+        
+        content_parts = []
+        tool_calls = {}
+        stream = None
+        task_completed = False
+        try:
+            stream = self.client.chat.completions.create(stream=True, **api_params)
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                # Tool calls arrive as one run, so a chunk without one means none are left
+                if task_completed and not delta.tool_calls:
+                    if not self.silent:
+                        print("✂️  Task completion detected - closing stream early")
+                    break
+                if delta.content:
+                    content_parts.append(delta.content)
+                
+                for tool_call_delta in delta.tool_calls or ():
+                    tool_call = tool_calls.setdefault(tool_call_delta.index, {
+                        "id": None,
+                        "type": "function",
+                        "function": {"name": "", "arguments": ""}
+                    })
+                    if tool_call_delta.id:
+                        tool_call["id"] = tool_call_delta.id
+                    if tool_call_delta.function:
+                        tool_call["function"]["name"] += tool_call_delta.function.name or ""
+                        tool_call["function"]["arguments"] += tool_call_delta.function.arguments or ""
+                    if (tool_call["function"]["name"] == "mark_task_complete"
+                            and _is_complete_json(tool_call["function"]["arguments"])):
+                        task_completed = True
+        except Exception as e:
+            raise self._wrap_llm_error(e)
+        finally:
+            if stream is not None:
+                stream.close()
+        
+        response = build_response(
+            "".join(content_parts) or None,
+            [tool_calls[index] for index in sorted(tool_calls)]
+        )
+        if cache_key is not None:
+            self.llm_cache.set(cache_key, response)
+        return response
+    
+    async def acall_llm(self, messages):
+        """Async variant of call_llm; concurrent calls are bounded by max_concurrency"""
+        api_params = self._build_api_params(messages)
+        cache_key = self._get_cache_key(api_params)
+        cached_response = self._get_cached_response(cache_key)
+        if cached_response is not None:
+            return cached_response
+        
+        if self.async_client is None:
+            self.async_client = ProviderClientFactory.create_async_client(self.provider_config)
+        
+        async with self.llm_semaphore:
+            try:
+                response = await self.async_client.chat.completions.create(**api_params)
+            except Exception as e:
+                raise self._wrap_llm_error(e)
+        
+        if cache_key is not None:
+            self.llm_cache.set(cache_key, response)
+        return response
+    
+    def handle_tool_call(self, tool_call, tool_args=None):
+        """Handle a tool call and return the result message.
+        
+        tool_args may carry arguments the caller already parsed.
+        """
         try:
             # Extract tool name and arguments
             tool_name = tool_call.function.name
-            tool_args = json.loads(tool_call.function.arguments)
+            if tool_args is None:
+                tool_args = _json_loads(tool_call.function.arguments)
             
-            # Call appropriate tool from tool_mapping
-            if tool_name in self.tool_mapping:
-                tool_result = self.tool_mapping[tool_name](**tool_args)
-            else:
+            # Reuse the result of an identical earlier call to a cacheable tool
+            cache_key = None
+            if tool_name in self.cacheable_tools:
+                cache_key = (tool_name, _json_dumps(tool_args, sort_keys=True))
+                content = self.tool_cache.get(cache_key)
+                self._record_tool_cache_lookup(tool_name, content is not None)
+                if content is not None:
+                    if not self.silent:
+                        print(f"   💾 Tool cache hit: {tool_name}")
+                    return {
+                        "role": "tool",
+                        "tool_call_id": tool_call.id,
+                        "name": tool_name,
+                        "content": content
+                    }
+            
+            # Call appropriate tool from tool_mapping (single lookup)
+            tool_fn = self.tool_mapping.get(tool_name)
+            if tool_fn is None:
                 tool_result = {"error": f"Unknown tool: {tool_name}"}
+            else:
+                tool_result = tool_fn(**tool_args)
+                # A tool with side effects (e.g. write_file) may change what cached reads would return
+                if tool_name not in self.read_only_tools:
+                    self.tool_cache.clear()
+            
+            content = _json_dumps(tool_result)
+            
+            # Only successful results are worth replaying
+            if cache_key is not None and not (isinstance(tool_result, dict) and "error" in tool_result):
+                self.tool_cache.set(cache_key, content)
             
             # Return tool result message
             return {
                 "role": "tool",
                 "tool_call_id": tool_call.id,
                 "name": tool_name,
-                "content": json.dumps(tool_result)
+                "content": content
             }
         
         except Exception as e:
@@ -124,7 +445,24 @@ class UniversalAgent:
                 "role": "tool",
                 "tool_call_id": tool_call.id,
                 "name": tool_name,
-                "content": json.dumps({"error": f"Tool execution failed: {str(e)}"})
+                "content": _json_dumps({"error": f"Tool execution failed: {str(e)}"})
+            }
+    
+    def _record_tool_cache_lookup(self, tool_name, hit):
+        """Count per-tool cache hits/misses"""
+        with self._tool_cache_stats_lock:
+            stats = self.tool_cache_stats.setdefault(tool_name, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += 1
+    
+    def get_tool_cache_stats(self) -> dict:
+        """Get per-tool cache hit rates, useful for pruning the cacheable set"""
+        with self._tool_cache_stats_lock:
+            return {
+                tool_name: {
+                    **stats,
+                    "hit_rate": stats["hits"] / (stats["hits"] + stats["misses"])
+                }
+                for tool_name, stats in self.tool_cache_stats.items()
             }
     
     def get_provider_info(self) -> dict:
@@ -139,102 +477,152 @@ class UniversalAgent:
             "context_window": self.model_info.get('context_window', 'Unknown')
         }
     
-    def run(self, user_input: str):
-        """Run the agent with user input and return FULL conversation content"""
-        # Initialize messages with system prompt and user input
-        system_prompt = self.config_manager.get_system_prompt()
-        messages = [
-            {
-                "role": "system",
-                "content": system_prompt
-            },
+    def _initial_messages(self, user_input: str):
+        """Build the opening conversation (system prompt + user input)"""
+        # The system message is shared between runs; it is never modified
+        return [
+            self._system_message,
             {
                 "role": "user",
                 "content": user_input
             }
         ]
+    
+    def _record_assistant_message(self, response, messages, full_response_content):
+        """Append the assistant turn to messages and capture its content.
         
-        # Track all assistant responses for full content capture
-        full_response_content = []
+        Returns the tool calls requested by the assistant (empty if none) and their
+        parsed arguments, so each call's arguments are decoded only once.
+        """
+        assistant_message = response.choices[0].message
+        # The SDK message always has tool_calls (None when absent)
+        tool_calls = assistant_message.tool_calls or ()
+        message_dict = {
+            "role": "assistant",
+            "content": assistant_message.content
+        }
+        
+        # Only add tool_calls if they exist
+        if tool_calls:
+            message_dict["tool_calls"] = tool_calls
+            
+        messages.append(message_dict)
+        
+        tool_args = [_parse_tool_arguments(tool_call) for tool_call in tool_calls]
+        
+        # Capture assistant content for full response
+        # If content is empty but there are tool calls, use the tool call arguments as content
+        if assistant_message.content:
+            full_response_content.append(assistant_message.content)
+            if self.content_trim_threshold and len(assistant_message.content) > self.content_trim_threshold:
+                self._trim_previous_assistant_content(messages)
+        elif tool_calls:
+            # Extract content from tool calls, particularly the mark_task_complete tool
+            for tool_call, args in zip(tool_calls, tool_args):
+                if tool_call.function.name == "mark_task_complete":
+                    _append_completion_message(args, full_response_content)
+        
+        return tool_calls, tool_args
+    
+    def _trim_previous_assistant_content(self, messages):
+        """Clear the text of the previous assistant tool-call turn.
+        
+        Its content is already in the response buffer, so resending it only grows
+        the next request. Turns without tool calls are kept since the API requires
+        their content.
+        """
+        for message in reversed(messages[:-1]):
+            if isinstance(message, dict) and message.get("role") == "assistant":
+                if message.get("tool_calls"):
+                    message["content"] = None
+                return
+    
+    def _announce_tool_calls(self, tool_calls):
+        """Log the tool calls about to be dispatched"""
+        if not self.silent:
+            print(f"🔧 Agent making {len(tool_calls)} tool call(s)")
+            for tool_call in tool_calls:
+                print(f"   📞 Calling tool: {tool_call.function.name}")
+    
+    def _apply_tool_results(self, tool_calls, tool_args, tool_results, messages, full_response_content):
+        """Append tool results (in call order) to messages.
+        
+        Returns True when the task completion tool was called.
+        """
+        messages.extend(tool_results)
+        
+        # Check if any of the calls was the task completion tool
+        for tool_call, args in zip(tool_calls, tool_args):
+            if tool_call.function.name == "mark_task_complete":
+                if not self.silent:
+                    print("✅ Task completion tool called - exiting loop")
+                # Extract final message from tool arguments
+                _append_completion_message(args, full_response_content)
+                return True
+        
+        return False
+    
+    def _can_run_concurrently(self, tool_calls):
+        """Only a batch made up entirely of read-only tools may run out of order"""
+        return len(tool_calls) > 1 and all(
+            tool_call.function.name in self.read_only_tools for tool_call in tool_calls
+        )
+    
+    def _execute_tool_calls(self, tool_calls, tool_args, messages, full_response_content):
+        """Run the requested tools, appending results to messages.
         
-        # Get agent configuration
-        agent_config = self.config_manager.get_agent_config()
-        max_iterations = agent_config.get('max_iterations', 10)
-        iteration = 0
+        Read-only tools run concurrently; a batch with any other tool runs in call order.
+        Returns True when the task completion tool was called.
+        """
+        self._announce_tool_calls(tool_calls)
+        if not self._can_run_concurrently(tool_calls):
+            tool_results = [self.handle_tool_call(tool_call, args) for tool_call, args in zip(tool_calls, tool_args)]
+        else:
+            # Independent tool calls overlap, so the turn takes max(t_i) rather than sum(t_i)
+            with ThreadPoolExecutor(max_workers=len(tool_calls)) as executor:
+                tool_results = list(executor.map(self.handle_tool_call, tool_calls, tool_args))
+        return self._apply_tool_results(tool_calls, tool_args, tool_results, messages, full_response_content)
+    
+    async def ahandle_tool_call(self, tool_call, tool_args=None):
+        """Async variant of handle_tool_call; tools run in a worker thread"""
+        return await asyncio.to_thread(self.handle_tool_call, tool_call, tool_args)
+    
+    async def _aexecute_tool_calls(self, tool_calls, tool_args, messages, full_response_content):
+        """Async variant of _execute_tool_calls"""
+        self._announce_tool_calls(tool_calls)
+        if not self._can_run_concurrently(tool_calls):
+            tool_results = [
+                await self.ahandle_tool_call(tool_call, args) for tool_call, args in zip(tool_calls, tool_args)
+            ]
+        else:
+            # gather preserves call order in its results
+            tool_results = await asyncio.gather(*(
+                self.ahandle_tool_call(tool_call, args) for tool_call, args in zip(tool_calls, tool_args)
+            ))
+        return self._apply_tool_results(tool_calls, tool_args, tool_results, messages, full_response_content)
+    
+    def run(self, user_input: str):
+        """Run the agent with user input and return FULL conversation content"""
+        # Initialize messages with system prompt and user input
+        messages = self._initial_messages(user_input)
         
-        # Remove dummy tool addition - handle empty tools at API call level instead
-        # The dummy tool was interfering with normal agent operation
+        # Track all assistant responses for full content capture
+        full_response_content = _ResponseBuffer()
         
-        while iteration < max_iterations:
-            iteration += 1
+        max_iterations = self._max_iterations
+        for iteration in range(1, max_iterations + 1):
             if not self.silent:
                 print(f"🔄 Agent iteration {iteration}/{max_iterations}")
             
             # Call LLM
-            response = self.call_llm(messages)
-            
-            # Add the response to messages
-            assistant_message = response.choices[0].message
-            message_dict = {
-                "role": "assistant",
-                "content": assistant_message.content
-            }
-            
-            # Only add tool_calls if they exist
-            if hasattr(assistant_message, 'tool_calls') and assistant_message.tool_calls:
-                message_dict["tool_calls"] = assistant_message.tool_calls
-                
-            messages.append(message_dict)
-            
-            # Capture assistant content for full response
-            # If content is empty but there are tool calls, use the tool call arguments as content
-            if assistant_message.content:
-                full_response_content.append(assistant_message.content)
-            elif hasattr(assistant_message, 'tool_calls') and assistant_message.tool_calls:
-                # Extract content from tool calls, particularly the mark_task_complete tool
-                for tool_call in assistant_message.tool_calls:
-                    if tool_call.function.name == "mark_task_complete":
-                        try:
-                            args = json.loads(tool_call.function.arguments)
-                            if 'completion_message' in args:
-                                full_response_content.append(args['completion_message'])
-                            elif 'task_summary' in args:
-                                full_response_content.append(args['task_summary'])
-                        except:
-                            pass
+            response = self.stream_llm(messages) if self.stream_responses else self.call_llm(messages)
+            tool_calls, tool_args = self._record_assistant_message(response, messages, full_response_content)
             
             # Check if there are tool calls
-            if assistant_message.tool_calls:
-                if not self.silent:
-                    print(f"🔧 Agent making {len(assistant_message.tool_calls)} tool call(s)")
-                # Handle each tool call
-                task_completed = False
-                for tool_call in assistant_message.tool_calls:
-                    if not self.silent:
-                        print(f"   📞 Calling tool: {tool_call.function.name}")
-                    tool_result = self.handle_tool_call(tool_call)
-                    messages.append(tool_result)
-                    
-                    # Check if this was the task completion tool
-                    if tool_call.function.name == "mark_task_complete":
-                        task_completed = True
-                        if not self.silent:
-                            print("✅ Task completion tool called - exiting loop")
-                        # Extract final message from tool arguments
-                        try:
-                            args = json.loads(tool_call.function.arguments)
-                            if 'completion_message' in args:
-                                full_response_content.append(args['completion_message'])
-                            elif 'task_summary' in args:
-                                full_response_content.append(args['task_summary'])
-                        except:
-                            pass
-                        # Return FULL conversation content
-                        return "\n\n".join(full_response_content)
-                
-                # If task was completed, we already returned above
-                if task_completed:
-                    return "\n\n".join(full_response_content)
+            if tool_calls:
+                if self._execute_tool_calls(tool_calls, tool_args, messages, full_response_content):
+                    # Return FULL conversation content
+                    return full_response_content.getvalue()
             else:
                 if not self.silent:
                     print("💭 Agent responded without tool calls - continuing loop")
@@ -242,7 +630,35 @@ class UniversalAgent:
             # Continue the loop regardless of whether there were tool calls or not
         
         # If max iterations reached, return whatever content we gathered
-        return "\n\n".join(full_response_content) if full_response_content else "Maximum iterations reached. The agent may be stuck in a loop."
+        return full_response_content.getvalue() if full_response_content else "Maximum iterations reached. The agent may be stuck in a loop."
+    
+    async def arun(self, user_input: str):
+        """Async variant of run; awaits the LLM so many agents can share one event loop"""
+        messages = self._initial_messages(user_input)
+        full_response_content = _ResponseBuffer()
+        
+        max_iterations = self._max_iterations
+        for iteration in range(1, max_iterations + 1):
+            if not self.silent:
+                print(f"🔄 Agent iteration {iteration}/{max_iterations}")
+            
+            response = await self.acall_llm(messages)
+            tool_calls, tool_args = self._record_assistant_message(response, messages, full_response_content)
+            
+            if tool_calls:
+                if await self._aexecute_tool_calls(tool_calls, tool_args, messages, full_response_content):
+                    return full_response_content.getvalue()
+            else:
+                if not self.silent:
+                    print("💭 Agent responded without tool calls - continuing loop")
+        
+        return full_response_content.getvalue() if full_response_content else "Maximum iterations reached. The agent may be stuck in a loop."
+    
+    async def aclose(self):
+        """Close the async client, if one was created"""
+        if self.async_client is not None:
+            client, self.async_client = self.async_client, None
+            await client.close()
 
 # Backward compatibility: OpenRouterAgent is now an alias for UniversalAgent
 class OpenRouterAgent(UniversalAgent):
@@ -252,21 +668,14 @@ class OpenRouterAgent(UniversalAgent):
     """
     
     def __init__(self, config_path="config.yaml", silent=False):
-        # Check if this is a legacy config file (has 'openrouter' key but no 'provider' key)
-        try:
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            
-            # If it's a legacy config, we need to handle it specially
-            if 'openrouter' in config and 'provider' not in config:
-                if not silent:
-                    print("⚠️  Using legacy OpenRouter configuration format")
-                    print("💡 Consider updating to the new universal configuration format")
-        except Exception:
-            pass  # If we can't read the config, let UniversalAgent handle the error
-        
         # Initialize as UniversalAgent
         super().__init__(config_path, silent)
+        
+        # Legacy config files have an 'openrouter' key but no 'provider' key
+        if 'openrouter' in self.config and 'provider' not in self.config:
+            if not silent:
+                print("⚠️  Using legacy OpenRouter configuration format")
+                print("💡 Consider updating to the new universal configuration format")
 
 
 # For convenience, create an alias
@@ -5,16 +5,70 @@ Supports multiple providers (OpenRouter, DeepSeek) with validation.
 
 import yaml
 import os
+import sys
+import copy
+import functools
+import tempfile
 from typing import Dict, Any, List
 from dataclasses import dataclass, field
 
+# Prefer the LibYAML C parser and emitter when PyYAML was built with them
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
 
 class ConfigurationError(Exception):
     """Configuration-related errors"""
     pass
 
 
-@dataclass
+@functools.lru_cache(maxsize=16)
+def _load_yaml_cached(abspath: str, mtime_ns: int, size: int) -> Any:
+    """Parse a YAML file once per (path, mtime, size); callers must not mutate the result"""
+    with open(abspath, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+
+def write_file_atomic(path: str, data: bytes) -> None:
+    """Write to a sibling temporary file, sync it, and move it over the target.
+    
+    A crash mid-write leaves the previous file intact instead of a truncated
+    one, and the target keeps its permissions. New files stay owner-only.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            try:
+                # mkstemp creates the file owner-only; keep the original permissions
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+            except FileNotFoundError:
+                pass
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_yaml_atomic(path: str, data: Any) -> None:
+    """Write YAML to path with write_file_atomic"""
+    text = yaml.dump(data, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True)
+    write_file_atomic(path, text.encode('utf-8'))
+
+
+# Slotted dataclasses need Python 3.10+; older interpreters keep a per-instance __dict__
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**DATACLASS_SLOTS)
 class ProviderConfig:
     """Provider configuration data model"""
     provider_type: str
@@ -56,8 +110,10 @@ class ConfigurationManager:
             raise ConfigurationError(f"Configuration file not found: {config_path}")
         
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                self.config = yaml.safe_load(f)
+            # Agents spawned in parallel load the same file; only re-parse when it changes
+            stat = os.stat(config_path)
+            cached = _load_yaml_cached(os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size)
+            self.config = copy.deepcopy(cached)
             self.config_path = config_path
             return self.config
         except yaml.YAMLError as e:
@@ -189,8 +245,7 @@ class ConfigurationManager:
             self.config['multi_model'] = multi_model_config
             
             # Write to file
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, default_flow_style=False, allow_unicode=True)
+            write_yaml_atomic(self.config_path, self.config)
             
             return True
         except Exception as e:
@@ -206,8 +261,7 @@ class ConfigurationManager:
                 del self.config['multi_model']
                 
                 # Write to file
-                with open(self.config_path, 'w', encoding='utf-8') as f:
-                    yaml.dump(self.config, f, default_flow_style=False, allow_unicode=True)
+                write_yaml_atomic(self.config_path, self.config)
             
             return True
         except Exception as e:
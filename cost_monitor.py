@@ -3,11 +3,41 @@
 Real-time cost monitoring and budget alert system for multi-agent execution.
 """
 
+import sys
+import json
 import time
+import bisect
 import threading
-from typing import Dict, List, Optional, Callable, Any
-from dataclasses import dataclass
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, NamedTuple, Optional, Callable, Any, TextIO, Tuple
+from dataclasses import asdict, dataclass, is_dataclass
 from datetime import datetime, timedelta
+from config_manager import DATACLASS_SLOTS
+
+# orjson encodes the per-entry records of streamed reports faster when available
+try:
+    import orjson
+    
+    def _dumps_entry(entry: Dict[str, Any]) -> str:
+        return orjson.dumps(entry).decode()
+except ImportError:
+    def _dumps_entry(entry: Dict[str, Any]) -> str:
+        return json.dumps(entry)
+
+
+# Number of independently locked partitions that cost records are spread over
+# (a power of two, so an agent's stripe is picked with a bit mask)
+COST_STRIPES = 16
+
+# Detailed entries kept per stripe; totals and per-model/agent aggregates are never evicted
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Window used for the "recent" real-time statistics
+RECENT_WINDOW_SECONDS = 60.0
+
+# Monitoring reports are triggered each time usage enters a new quarter of the budget
+REPORT_BUCKETS = 4
 
 
 @dataclass
@@ -20,7 +50,7 @@ class CostAlert:
     trigger_time: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class AgentCostEntry:
     """Individual cost entry for an agent."""
     agent_id: int
@@ -28,37 +58,165 @@ class AgentCostEntry:
     input_tokens: int
     output_tokens: int
     cost: float
-    timestamp: datetime
+    timestamp: float  # time.time() seconds; converted to datetime only for reports
+
+
+class _StripeStats(NamedTuple):
+    """Immutable stripe totals published for lock-free readers."""
+    total: float
+    recent_cost: float
+    active_agents: int
+    oldest_recent: Optional[float]  # monotonic time of the oldest entry in the window
+
+
+_EMPTY_STRIPE_STATS = _StripeStats(0.0, 0.0, 0, None)
+
+
+class _CostStripe:
+    """One lock-protected partition of the recorded costs.
+    
+    Detailed entries are kept in a bounded ring; running aggregates cover the
+    whole session so summaries never scan the history.
+    """
+    
+    __slots__ = ('lock', 'version', 'entries', 'recent', 'recent_cost', 'recent_agents',
+                 'total', 'count', 'agent_costs', 'model_usage', 'stats')
+    
+    def __init__(self, max_entries: int):
+        self.lock = threading.Lock()
+        # Bumped on every change so readers can tell whether cached aggregates are stale
+        self.version = 0
+        self.entries: deque = deque(maxlen=max_entries)
+        # (monotonic time, cost, agent_id) for entries inside the recent window
+        self.recent: deque = deque()
+        # Running sum and per-agent entry counts over the recent window
+        self.recent_cost = 0.0
+        self.recent_agents: Counter = Counter()
+        self.total = 0.0
+        self.count = 0
+        self.agent_costs: Dict[int, float] = {}
+        self.model_usage: Dict[str, Dict[str, float]] = {}
+        # Replaced (never mutated) after every change; read without the lock
+        self.stats = _EMPTY_STRIPE_STATS
+    
+    def add(self, entry: AgentCostEntry, now: float):
+        self._accumulate(entry, now)
+        self.version += 1
+        self.prune_recent(now)
+    
+    def add_many(self, entries: List[AgentCostEntry], now: float):
+        """Add a batch; the window is pruned and the stats published once."""
+        for entry in entries:
+            self._accumulate(entry, now)
+        self.version += 1
+        self.prune_recent(now)
+    
+    def _accumulate(self, entry: AgentCostEntry, now: float):
+        self.entries.append(entry)
+        self.recent.append((now, entry.cost, entry.agent_id))
+        self.recent_cost += entry.cost
+        self.recent_agents[entry.agent_id] += 1
+        self.total += entry.cost
+        self.count += 1
+        self.agent_costs[entry.agent_id] = self.agent_costs.get(entry.agent_id, 0.0) + entry.cost
+        
+        usage = self.model_usage.get(entry.model)
+        if usage is None:
+            usage = self.model_usage[entry.model] = {'cost': 0.0, 'calls': 0, 'input_tokens': 0, 'output_tokens': 0}
+        usage['cost'] += entry.cost
+        usage['calls'] += 1
+        usage['input_tokens'] += entry.input_tokens
+        usage['output_tokens'] += entry.output_tokens
+    
+    def prune_recent(self, now: float):
+        cutoff = now - RECENT_WINDOW_SECONDS
+        recent = self.recent
+        recent_agents = self.recent_agents
+        while recent and recent[0][0] < cutoff:
+            _, cost, agent_id = recent.popleft()
+            self.recent_cost -= cost
+            if recent_agents[agent_id] == 1:
+                del recent_agents[agent_id]
+            else:
+                recent_agents[agent_id] -= 1
+        if not recent:
+            # Drop accumulated rounding error once the window is empty
+            self.recent_cost = 0.0
+        self._publish()
+    
+    def _publish(self):
+        self.stats = _StripeStats(
+            self.total,
+            self.recent_cost,
+            len(self.recent_agents),
+            self.recent[0][0] if self.recent else None
+        )
+    
+    def clear(self):
+        self.version += 1
+        self.entries.clear()
+        self.recent.clear()
+        self.recent_cost = 0.0
+        self.recent_agents.clear()
+        self.total = 0.0
+        self.count = 0
+        self.agent_costs.clear()
+        self.model_usage.clear()
+        self._publish()
 
 
 class CostMonitor:
-    """Real-time cost monitoring system for multi-agent execution."""
+    """Real-time cost monitoring system for multi-agent execution.
+    
+    Costs are recorded into lock stripes chosen by agent id, so concurrent
+    agents rarely contend; readers combine the stripes.
+    """
     
-    def __init__(self, budget_limit: Optional[float] = None, alert_callback: Optional[Callable] = None):
+    def __init__(self, budget_limit: Optional[float] = None, alert_callback: Optional[Callable] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, silent: bool = False):
         self.budget_limit = budget_limit
         self.alert_callback = alert_callback
+        self.max_entries = max_entries
+        self.silent = silent
+        # Called with the cost delta on every change (see add_cost_listener)
+        self.cost_listeners: List[Callable[[float], None]] = []
         
         # Cost tracking
-        self.cost_entries: List[AgentCostEntry] = []
-        self.total_cost = 0.0
-        self.agent_costs: Dict[int, float] = {}
+        self._stripes = [_CostStripe(max_entries) for _ in range(COST_STRIPES)]
+        # (version, aggregates) from the last _snapshot
+        self._cached_snapshot = (-1, None)
         
-        # Alerts
+        # Alerts; _alerts_sorted orders them by threshold and _next_alert_idx points
+        # at the first one that has not fired yet
         self.alerts: List[CostAlert] = []
+        self._alerts_sorted: List[CostAlert] = []
+        self._alert_thresholds: List[float] = []
+        self._next_alert_idx = 0
         self._setup_default_alerts()
         
         # Monitoring
         self.monitoring_active = False
         self.monitor_thread: Optional[threading.Thread] = None
+        # Set by record_agent_cost when usage crosses into a new budget bucket
+        self._wake = threading.Event()
+        self._stop_requested = threading.Event()
+        self._last_bucket = 0
+        # Guards alerts, statistics and _last_bucket; recording only takes a stripe lock
         self.lock = threading.Lock()
         
         # Statistics
         self.session_start_time = datetime.now()
+        self._session_start = time.monotonic()  # Clock used for rate math
         self.peak_cost_rate = 0.0  # Cost per minute
         self.last_cost_check = datetime.now()
     
     def _setup_default_alerts(self):
         """Setup default cost alerts."""
+        self._setup_budget_alerts()
+        self._rebuild_alert_index()
+    
+    def _setup_budget_alerts(self):
+        """Create the 50%/80%/100% budget alerts."""
         if self.budget_limit:
             self.alerts = [
                 CostAlert(
@@ -78,68 +236,209 @@ class CostMonitor:
                 )
             ]
     
+    def _rebuild_alert_index(self):
+        """Re-sort alerts by threshold and point the cursor at the first untriggered one."""
+        self._alerts_sorted = sorted(self.alerts, key=lambda alert: alert.threshold)
+        self._alert_thresholds = [alert.threshold for alert in self._alerts_sorted]
+        self._next_alert_idx = next(
+            (i for i, alert in enumerate(self._alerts_sorted) if not alert.triggered),
+            len(self._alerts_sorted)
+        )
+    
+    def _stripe_for(self, agent_id: int) -> _CostStripe:
+        """Stripe that holds the costs of an agent."""
+        return self._stripes[agent_id & (COST_STRIPES - 1)]
+    
+    @contextmanager
+    def _all_stripes_locked(self):
+        """Hold every stripe lock (always in the same order) for a consistent snapshot."""
+        for stripe in self._stripes:
+            stripe.lock.acquire()
+        try:
+            yield self._stripes
+        finally:
+            for stripe in reversed(self._stripes):
+                stripe.lock.release()
+    
+    @property
+    def total_cost(self) -> float:
+        """Total cost recorded in this session."""
+        return sum(stripe.total for stripe in self._stripes)
+    
+    @property
+    def agent_costs(self) -> Dict[int, float]:
+        """Cost per agent id (a mutable copy)."""
+        return dict(self._snapshot()[2])
+    
+    @property
+    def cost_entries(self) -> List[AgentCostEntry]:
+        """Retained cost entries in recording order (a copy)."""
+        with self._all_stripes_locked() as stripes:
+            entries = [entry for stripe in stripes for entry in stripe.entries]
+        entries.sort(key=lambda entry: entry.timestamp)
+        return entries
+    
+    def add_cost_listener(self, listener: Callable[[float], None]):
+        """Register a callback that receives the change in total cost on every record or reset."""
+        self.cost_listeners.append(listener)
+    
+    def _notify_cost_listeners(self, delta: float):
+        for listener in self.cost_listeners:
+            try:
+                listener(delta)
+            except Exception as e:
+                if not self.silent:
+                    print(f"Cost listener failed: {e}")
+    
     def add_custom_alert(self, threshold: float, message: str, alert_type: str = 'custom'):
         """Add a custom cost alert."""
+        alert = CostAlert(
+            threshold=threshold,
+            message=message,
+            alert_type=alert_type
+        )
         with self.lock:
-            self.alerts.append(CostAlert(
-                threshold=threshold,
-                message=message,
-                alert_type=alert_type
-            ))
+            self.alerts.append(alert)
+            index = bisect.bisect_right(self._alert_thresholds, threshold)
+            self._alert_thresholds.insert(index, threshold)
+            self._alerts_sorted.insert(index, alert)
+            # An alert below the cursor must still fire on the next check
+            self._next_alert_idx = min(self._next_alert_idx, index)
     
     def record_agent_cost(self, agent_id: int, model: str, input_tokens: int, output_tokens: int, cost: float):
         """Record cost for an agent execution."""
-        with self.lock:
-            # Create cost entry
+        # Read the clocks once per record
+        now = time.monotonic()
+        
+        # Entries share one string object per distinct model name
+        if type(model) is str:
+            model = sys.intern(model)
+        
+        # Create cost entry
+        entry = AgentCostEntry(
+            agent_id=agent_id,
+            model=model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost=cost,
+            timestamp=time.time()
+        )
+        
+        stripe = self._stripe_for(agent_id)
+        with stripe.lock:
+            stripe.add(entry, now)
+        
+        self._after_record(cost, now)
+    
+    def record_agent_costs(self, batch: Iterable[Tuple[int, str, int, int, float]]):
+        """Record several agent executions at once.
+        
+        Each item is (agent_id, model, input_tokens, output_tokens, cost). The
+        clocks are read once, each stripe lock is taken once, and alerts,
+        listeners and rate statistics are updated once for the whole batch.
+        """
+        now = time.monotonic()
+        timestamp = time.time()
+        
+        by_stripe: Dict[_CostStripe, List[AgentCostEntry]] = {}
+        batch_cost = 0.0
+        for agent_id, model, input_tokens, output_tokens, cost in batch:
+            if type(model) is str:
+                model = sys.intern(model)
             entry = AgentCostEntry(
                 agent_id=agent_id,
                 model=model,
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
                 cost=cost,
-                timestamp=datetime.now()
+                timestamp=timestamp
             )
-            
-            self.cost_entries.append(entry)
-            self.total_cost += cost
-            
-            # Update agent-specific costs
-            if agent_id not in self.agent_costs:
-                self.agent_costs[agent_id] = 0.0
-            self.agent_costs[agent_id] += cost
-            
-            # Check alerts
-            self._check_alerts()
-            
-            # Update cost rate statistics
-            self._update_cost_rate()
+            by_stripe.setdefault(self._stripe_for(agent_id), []).append(entry)
+            batch_cost += cost
+        
+        if not by_stripe:
+            return
+        
+        for stripe, entries in by_stripe.items():
+            with stripe.lock:
+                stripe.add_many(entries, now)
+        
+        self._after_record(batch_cost, now)
+    
+    def _after_record(self, cost: float, now: float):
+        """Notify listeners, fire alerts and update statistics after new costs are stored."""
+        self._notify_cost_listeners(cost)
+        total_cost = self.total_cost
+        
+        # Check alerts
+        self._check_alerts(total_cost)
+        
+        # Update cost rate statistics
+        self._update_cost_rate(total_cost, now)
+        
+        # Wake the monitoring thread only when there is something new to report
+        if self.budget_limit:
+            bucket = int(total_cost / self.budget_limit * REPORT_BUCKETS)
+            if bucket > self._last_bucket:
+                # Records on other stripes may cross the same bucket; only one of them wakes the thread
+                with self.lock:
+                    crossed = bucket > self._last_bucket
+                    if crossed:
+                        self._last_bucket = bucket
+                if crossed:
+                    self._wake.set()
     
-    def _check_alerts(self):
-        """Check if any cost alerts should be triggered."""
-        for alert in self.alerts:
-            if not alert.triggered and self.total_cost >= alert.threshold:
+    def _check_alerts(self, total_cost: Optional[float] = None):
+        """Fire alerts whose threshold has been reached.
+        
+        Alerts are sorted by threshold, so only the cursor position needs
+        checking; the lock is taken only when a threshold is crossed.
+        """
+        if total_cost is None:
+            total_cost = self.total_cost
+        
+        index = self._next_alert_idx
+        thresholds = self._alert_thresholds
+        if index >= len(thresholds) or total_cost < thresholds[index]:
+            return
+        
+        fired = []
+        with self.lock:
+            while (self._next_alert_idx < len(self._alerts_sorted)
+                   and total_cost >= self._alerts_sorted[self._next_alert_idx].threshold):
+                alert = self._alerts_sorted[self._next_alert_idx]
+                self._next_alert_idx += 1
+                if alert.triggered:
+                    continue
                 alert.triggered = True
                 alert.trigger_time = datetime.now()
-                
-                # Call alert callback if provided
-                if self.alert_callback:
-                    try:
-                        self.alert_callback(alert)
-                    except Exception as e:
-                        print(f"Alert callback failed: {e}")
-                else:
-                    # Default alert handling
-                    print(f"💰 COST ALERT [{alert.alert_type.upper()}]: {alert.message}")
-    
-    def _update_cost_rate(self):
+                fired.append(alert)
+        
+        for alert in fired:
+            # Call alert callback if provided
+            if self.alert_callback:
+                try:
+                    self.alert_callback(alert)
+                except Exception as e:
+                    print(f"Alert callback failed: {e}")
+            else:
+                # Default alert handling
+                print(f"💰 COST ALERT [{alert.alert_type.upper()}]: {alert.message}")
+    
+    def _update_cost_rate(self, total_cost: Optional[float] = None, now: Optional[float] = None):
         """Update cost rate statistics."""
-        now = datetime.now()
-        time_diff = (now - self.session_start_time).total_seconds() / 60.0  # minutes
+        if total_cost is None:
+            total_cost = self.total_cost
+        if now is None:
+            now = time.monotonic()
+        time_diff = (now - self._session_start) / 60.0  # minutes
         
         if time_diff > 0:
-            current_rate = self.total_cost / time_diff
+            current_rate = total_cost / time_diff
             if current_rate > self.peak_cost_rate:
-                self.peak_cost_rate = current_rate
+                with self.lock:
+                    if current_rate > self.peak_cost_rate:
+                        self.peak_cost_rate = current_rate
     
     def start_monitoring(self, check_interval: float = 5.0):
         """Start real-time monitoring thread."""
@@ -147,6 +446,8 @@ class CostMonitor:
             return
         
         self.monitoring_active = True
+        self._stop_requested.clear()
+        self._wake.clear()
         self.monitor_thread = threading.Thread(
             target=self._monitoring_loop,
             args=(check_interval,),
@@ -157,85 +458,139 @@ class CostMonitor:
     def stop_monitoring(self):
         """Stop real-time monitoring."""
         self.monitoring_active = False
+        self._stop_requested.set()
+        self._wake.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=1.0)
     
     def _monitoring_loop(self, check_interval: float):
-        """Main monitoring loop."""
-        while self.monitoring_active:
+        """Main monitoring loop.
+        
+        Sleeps until record_agent_cost reports a budget bucket crossing instead
+        of polling; check_interval is the minimum gap between two reports.
+        """
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if not self.monitoring_active:
+                break
+            
             try:
-                with self.lock:
-                    # Update statistics
-                    self._update_cost_rate()
-                    
-                    # Check for budget warnings
-                    if self.budget_limit and self.total_cost > 0:
-                        usage_percentage = (self.total_cost / self.budget_limit) * 100
-                        
-                        # Log periodic updates
-                        if usage_percentage > 25:  # Only log if significant usage
-                            print(f"💰 Cost Update: ${self.total_cost:.6f} ({usage_percentage:.1f}% of budget)")
+                total_cost = self.total_cost
                 
-                time.sleep(check_interval)
+                # Check for budget warnings
+                if self.budget_limit and total_cost > 0:
+                    usage_percentage = (total_cost / self.budget_limit) * 100
+                    
+                    # Log updates
+                    if usage_percentage > 25:  # Only log if significant usage
+                        print(f"💰 Cost Update: ${total_cost:.6f} ({usage_percentage:.1f}% of budget)")
                 
             except Exception as e:
                 print(f"Monitoring error: {e}")
-                time.sleep(check_interval)
+            
+            # Coalesce bursts of crossings into one report
+            if self._stop_requested.wait(check_interval):
+                break
+    
+    def _data_version(self) -> int:
+        """Sum of stripe versions; changes whenever any recorded data changes."""
+        return sum(stripe.version for stripe in self._stripes)
+    
+    def _snapshot(self):
+        """Consistent copy of the running aggregates across all stripes.
+        
+        Reused until a stripe changes, so repeated summary reads skip locking
+        and merging the stripes. Callers must not mutate the result.
+        """
+        version, snapshot = self._cached_snapshot
+        if version == self._data_version():
+            return snapshot
+        
+        with self._all_stripes_locked() as stripes:
+            version = sum(stripe.version for stripe in stripes)
+            total_cost = sum(stripe.total for stripe in stripes)
+            total_entries = sum(stripe.count for stripe in stripes)
+            agent_costs = {agent_id: cost for stripe in stripes for agent_id, cost in stripe.agent_costs.items()}
+            model_usage: Dict[str, Dict[str, float]] = {}
+            for stripe in stripes:
+                for model, usage in stripe.model_usage.items():
+                    merged = model_usage.setdefault(model, {'cost': 0.0, 'calls': 0, 'input_tokens': 0, 'output_tokens': 0})
+                    for key, value in usage.items():
+                        merged[key] += value
+        
+        # Derived once per data version so repeated summaries skip the split
+        model_costs = {model: usage['cost'] for model, usage in model_usage.items()}
+        usage_counts = {
+            model: {key: usage[key] for key in ('calls', 'input_tokens', 'output_tokens')}
+            for model, usage in model_usage.items()
+        }
+        
+        snapshot = (total_cost, total_entries, agent_costs, model_costs, usage_counts)
+        self._cached_snapshot = (version, snapshot)
+        return snapshot
     
     def get_cost_summary(self) -> Dict[str, Any]:
-        """Get comprehensive cost summary."""
-        with self.lock:
-            session_duration = (datetime.now() - self.session_start_time).total_seconds() / 60.0
-            
-            # Calculate model usage statistics
-            model_costs = {}
-            model_usage = {}
-            
-            for entry in self.cost_entries:
-                if entry.model not in model_costs:
-                    model_costs[entry.model] = 0.0
-                    model_usage[entry.model] = {'calls': 0, 'input_tokens': 0, 'output_tokens': 0}
-                
-                model_costs[entry.model] += entry.cost
-                model_usage[entry.model]['calls'] += 1
-                model_usage[entry.model]['input_tokens'] += entry.input_tokens
-                model_usage[entry.model]['output_tokens'] += entry.output_tokens
-            
-            # Calculate projected costs
-            projected_hourly_cost = 0.0
-            if session_duration > 0:
-                cost_per_minute = self.total_cost / session_duration
-                projected_hourly_cost = cost_per_minute * 60
-            
-            return {
-                'total_cost': self.total_cost,
-                'agent_costs': self.agent_costs.copy(),
-                'model_costs': model_costs,
-                'model_usage': model_usage,
-                'session_duration_minutes': session_duration,
-                'cost_per_minute': self.total_cost / session_duration if session_duration > 0 else 0.0,
-                'projected_hourly_cost': projected_hourly_cost,
-                'peak_cost_rate': self.peak_cost_rate,
-                'budget_limit': self.budget_limit,
-                'budget_remaining': self.budget_limit - self.total_cost if self.budget_limit else None,
-                'budget_usage_percentage': (self.total_cost / self.budget_limit * 100) if self.budget_limit else None,
-                'alerts_triggered': [alert for alert in self.alerts if alert.triggered],
-                'total_entries': len(self.cost_entries)
-            }
+        """Get comprehensive cost summary.
+        
+        The per-agent and per-model values are plain dicts copied from the cached
+        snapshot, so callers may modify or serialize them.
+        """
+        total_cost, total_entries, agent_costs, model_costs, model_usage = self._snapshot()
+        session_duration = (time.monotonic() - self._session_start) / 60.0
+        
+        # Calculate projected costs
+        projected_hourly_cost = 0.0
+        if session_duration > 0:
+            cost_per_minute = total_cost / session_duration
+            projected_hourly_cost = cost_per_minute * 60
+        
+        # Iterating a list that another thread appends to is safe, so no lock is needed
+        alerts_triggered = [alert for alert in self.alerts if alert.triggered]
+        
+        return {
+            'total_cost': total_cost,
+            'agent_costs': dict(agent_costs),
+            'model_costs': dict(model_costs),
+            'model_usage': {model: dict(usage) for model, usage in model_usage.items()},
+            'session_duration_minutes': session_duration,
+            'cost_per_minute': total_cost / session_duration if session_duration > 0 else 0.0,
+            'projected_hourly_cost': projected_hourly_cost,
+            'peak_cost_rate': self.peak_cost_rate,
+            'budget_limit': self.budget_limit,
+            'budget_remaining': self.budget_limit - total_cost if self.budget_limit else None,
+            'budget_usage_percentage': (total_cost / self.budget_limit * 100) if self.budget_limit else None,
+            'alerts_triggered': alerts_triggered,
+            'total_entries': total_entries
+        }
     
     def get_real_time_stats(self) -> Dict[str, Any]:
         """Get real-time statistics for display."""
-        with self.lock:
-            recent_entries = [e for e in self.cost_entries if (datetime.now() - e.timestamp).total_seconds() < 60]
-            recent_cost = sum(e.cost for e in recent_entries)
-            
-            return {
-                'current_total': self.total_cost,
-                'recent_cost_1min': recent_cost,
-                'active_agents': len(set(e.agent_id for e in recent_entries)),
-                'cost_rate_per_minute': self.peak_cost_rate,
-                'budget_status': 'OK' if not self.budget_limit or self.total_cost < self.budget_limit * 0.8 else 'WARNING'
-            }
+        now = time.monotonic()
+        cutoff = now - RECENT_WINDOW_SECONDS
+        recent_cost = 0.0
+        active_agents = 0
+        total_cost = 0.0
+        for stripe in self._stripes:
+            # Published stats are read without locking; a stripe is only locked
+            # when entries have expired from its window and must be pruned
+            stats = stripe.stats
+            if stats.oldest_recent is not None and stats.oldest_recent < cutoff:
+                with stripe.lock:
+                    stripe.prune_recent(now)
+                    stats = stripe.stats
+            recent_cost += stats.recent_cost
+            # An agent always maps to the same stripe, so counts never overlap
+            active_agents += stats.active_agents
+            total_cost += stats.total
+        
+        return {
+            'current_total': total_cost,
+            'recent_cost_1min': recent_cost,
+            'active_agents': active_agents,
+            'cost_rate_per_minute': self.peak_cost_rate,
+            'budget_status': 'OK' if not self.budget_limit or total_cost < self.budget_limit * 0.8 else 'WARNING'
+        }
     
     def export_cost_report(self, include_detailed_entries: bool = False) -> Dict[str, Any]:
         """Export detailed cost report."""
@@ -251,38 +606,55 @@ class CostMonitor:
         }
         
         if include_detailed_entries:
-            report['detailed_entries'] = [
-                {
-                    'agent_id': entry.agent_id,
-                    'model': entry.model,
-                    'input_tokens': entry.input_tokens,
-                    'output_tokens': entry.output_tokens,
-                    'cost': entry.cost,
-                    'timestamp': entry.timestamp.isoformat()
-                }
-                for entry in self.cost_entries
-            ]
+            report['detailed_entries'] = [_entry_record(entry) for entry in self.cost_entries]
         
         return report
     
+    def export_cost_report_stream(self, fp: TextIO, include_detailed_entries: bool = True):
+        """Write the cost report as JSON to a text file.
+        
+        Detailed entries are encoded and written one at a time instead of being
+        collected into a list first, so memory does not grow with the history.
+        """
+        report = self.export_cost_report(include_detailed_entries=False)
+        # Write the report object without its closing brace, then append the entries
+        fp.write(json.dumps(report, default=_report_json_default)[:-1])
+        
+        if include_detailed_entries:
+            fp.write(', "detailed_entries": [')
+            for index, entry in enumerate(self.cost_entries):
+                if index:
+                    fp.write(', ')
+                fp.write(_dumps_entry(_entry_record(entry)))
+            fp.write(']')
+        
+        fp.write('}')
+    
     def reset_session(self):
         """Reset all cost tracking for a new session."""
-        with self.lock:
-            self.cost_entries.clear()
-            self.total_cost = 0.0
-            self.agent_costs.clear()
+        with self._all_stripes_locked() as stripes, self.lock:
+            cleared_cost = sum(stripe.total for stripe in stripes)
+            for stripe in stripes:
+                stripe.clear()
             self.session_start_time = datetime.now()
+            self._session_start = time.monotonic()
             self.peak_cost_rate = 0.0
+            self._last_bucket = 0
             
             # Reset alert triggers
             for alert in self.alerts:
                 alert.triggered = False
                 alert.trigger_time = None
+            self._next_alert_idx = 0
+        
+        if cleared_cost:
+            self._notify_cost_listeners(-cleared_cost)
     
     def set_budget_limit(self, new_limit: float):
         """Update budget limit and reconfigure alerts."""
         with self.lock:
             self.budget_limit = new_limit
+            self._last_bucket = 0
             self.alerts.clear()
             self._setup_default_alerts()
     
@@ -296,20 +668,60 @@ class CostMonitor:
         self.stop_monitoring()
 
 
+def _entry_record(entry: AgentCostEntry) -> Dict[str, Any]:
+    """Report representation of a cost entry."""
+    return {
+        'agent_id': entry.agent_id,
+        'model': entry.model,
+        'input_tokens': entry.input_tokens,
+        'output_tokens': entry.output_tokens,
+        'cost': entry.cost,
+        'timestamp': datetime.fromtimestamp(entry.timestamp).isoformat()
+    }
+
+
+def _report_json_default(obj: Any) -> Any:
+    """Encode the alerts and timestamps that appear in cost reports."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if is_dataclass(obj):
+        return asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 class BudgetManager:
-    """Higher-level budget management with multiple cost monitors."""
+    """Higher-level budget management with multiple cost monitors.
+    
+    Monitors report cost deltas as they are recorded, so the global and
+    per-monitor totals are running values rather than recomputed sums.
+    """
     
     def __init__(self):
         self.monitors: Dict[str, CostMonitor] = {}
         self.global_budget: Optional[float] = None
         self.global_cost = 0.0
+        self.monitor_costs: Dict[str, float] = {}
+        self._lock = threading.Lock()
     
     def create_monitor(self, name: str, budget_limit: Optional[float] = None, alert_callback: Optional[Callable] = None) -> CostMonitor:
         """Create a new cost monitor."""
         monitor = CostMonitor(budget_limit, alert_callback)
-        self.monitors[name] = monitor
+        monitor.add_cost_listener(lambda delta, monitor=monitor: self._on_cost(name, monitor, delta))
+        with self._lock:
+            # A monitor replaced under the same name no longer counts
+            self.global_cost -= self.monitor_costs.get(name, 0.0)
+            self.monitor_costs[name] = 0.0
+            self.monitors[name] = monitor
         return monitor
     
+    def _on_cost(self, name: str, monitor: CostMonitor, delta: float):
+        """Roll a monitor's cost change into the running totals."""
+        with self._lock:
+            # Ignore monitors that have been replaced under the same name
+            if self.monitors.get(name) is monitor:
+                self.monitor_costs[name] += delta
+                self.global_cost += delta
+    
     def get_monitor(self, name: str) -> Optional[CostMonitor]:
         """Get existing cost monitor."""
         return self.monitors.get(name)
@@ -318,17 +730,26 @@ class BudgetManager:
         """Set global budget across all monitors."""
         self.global_budget = budget
     
-    def get_global_summary(self) -> Dict[str, Any]:
-        """Get summary across all monitors."""
-        total_cost = sum(monitor.total_cost for monitor in self.monitors.values())
+    def get_global_summary(self, full: bool = True) -> Dict[str, Any]:
+        """Get summary across all monitors.
         
-        return {
+        With full=False only the running totals are returned, without building
+        each monitor's detailed summary.
+        """
+        with self._lock:
+            total_cost = self.global_cost
+            monitor_costs = dict(self.monitor_costs)
+        
+        summary = {
             'total_cost_all_monitors': total_cost,
             'global_budget': self.global_budget,
             'global_budget_remaining': self.global_budget - total_cost if self.global_budget else None,
             'active_monitors': len(self.monitors),
-            'monitor_summaries': {
+            'monitor_costs': monitor_costs
+        }
+        if full:
+            summary['monitor_summaries'] = {
                 name: monitor.get_cost_summary()
                 for name, monitor in self.monitors.items()
             }
-        }
\ No newline at end of file
+        return summary
@@ -6,11 +6,12 @@ Debug script for synthesis issues with DeepSeek
 import json
 import yaml
 import sys
-from agent import UniversalAgent
-from orchestrator import TaskOrchestrator
 
 def debug_synthesis():
     """Debug the synthesis process in detail"""
+    # Imported here so importing this module does not load the agent stack
+    from agent import UniversalAgent, DUMMY_TOOL
+    
     print("🔍 Debugging Synthesis Process")
     print("=" * 60)
     
@@ -39,7 +40,7 @@ def debug_synthesis():
         
         # Remove ALL tools to simulate the issue
         print("\nRemoving ALL tools...")
-        original_tools = synthesis_agent.tools.copy()
+        original_tools = list(synthesis_agent.tools)
         synthesis_agent.tools = []
         synthesis_agent.tool_mapping = {}
         
@@ -77,22 +78,8 @@ def debug_synthesis():
             if "empty array" in str(e).lower():
                 print("\n🔧 Attempting fix: Adding dummy tool...")
                 
-                # Create a dummy tool that won't be used
-                dummy_tool = {
-                    "type": "function",
-                    "function": {
-                        "name": "dummy_tool",
-                        "description": "A dummy tool that does nothing",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {},
-                            "required": []
-                        }
-                    }
-                }
-                
                 # Add dummy tool and try again
-                api_params["tools"] = [dummy_tool]
+                api_params["tools"] = [DUMMY_TOOL]
                 print("Making API call with dummy tool...")
                 try:
                     response = synthesis_agent.client.chat.completions.create(**api_params)
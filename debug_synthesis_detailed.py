@@ -6,11 +6,13 @@ Detailed debug script for synthesis issues with DeepSeek
 import json
 import yaml
 import sys
-from agent import UniversalAgent
-from orchestrator import TaskOrchestrator
 
 def debug_synthesis_step_by_step():
     """Debug the synthesis process step by step with detailed logging"""
+    # Imported here so importing this module does not load the agent stack
+    from agent import UniversalAgent, DUMMY_TOOL
+    from orchestrator import TaskOrchestrator
+    
     print("🔍 Detailed Synthesis Debug")
     print("=" * 60)
     
@@ -46,8 +48,7 @@ def debug_synthesis_step_by_step():
             
             # Apply filtering
             print("\nApplying tool filtering...")
-            synthesis_agent.tools = [tool for tool in synthesis_agent.tools if tool.get('function', {}).get('name') != 'mark_task_complete']
-            synthesis_agent.tool_mapping = {name: func for name, func in synthesis_agent.tool_mapping.items() if name != 'mark_task_complete'}
+            synthesis_agent.remove_tools(("mark_task_complete",))
             
             print(f"After filtering: {len(synthesis_agent.tools)}")
             for i, tool in enumerate(synthesis_agent.tools):
@@ -56,19 +57,7 @@ def debug_synthesis_step_by_step():
             # Check if we need dummy tool
             if not synthesis_agent.tools:
                 print("⚠️ No tools left! Adding dummy tool...")
-                dummy_tool = {
-                    "type": "function",
-                    "function": {
-                        "name": "dummy_tool",
-                        "description": "A dummy tool that does nothing",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {},
-                            "required": []
-                        }
-                    }
-                }
-                synthesis_agent.tools = [dummy_tool]
+                synthesis_agent.tools = [DUMMY_TOOL]
                 print("✅ Dummy tool added")
             
             # Test synthesis prompt
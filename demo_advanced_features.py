@@ -4,10 +4,18 @@ Comprehensive demo of advanced multi-model configuration features.
 Demonstrates configuration testing, cost monitoring, export/import, and comparison tools.
 """
 
+import io
+import sys
 import json
-import yaml
 import tempfile
 import os
+import time
+import functools
+import itertools
+import threading
+import traceback
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from model_config.model_configuration_manager import ModelConfigurationManager
@@ -15,34 +23,111 @@ from model_config.data_models import AgentModelConfig, ModelInfo
 from cost_monitor import CostMonitor, BudgetManager
 from config_manager import ConfigurationManager
 
+# orjson encodes the exported configuration faster; fall back to stdlib json when unavailable
+try:
+    import orjson
+    
+    _json_loads = orjson.loads
+    
+    def _json_dumps_pretty(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps_pretty(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+# Scales the waits of the real-time demo, e.g. DEMO_SLEEP_SCALE=0.01 for quick runs
+DEMO_SLEEP_SCALE = float(os.environ.get('DEMO_SLEEP_SCALE', '1.0'))
+
+# Model profiles shared by the demos (read-only)
+_BUDGET_CONFIG = AgentModelConfig(
+    agent_0_model='deepseek-chat',
+    agent_1_model='deepseek-chat',
+    agent_2_model='deepseek-chat',
+    agent_3_model='deepseek-chat',
+    synthesis_model='deepseek-chat',
+    default_model='deepseek-chat',
+    profile_name='budget'
+)
+_BALANCED_CONFIG = AgentModelConfig(
+    agent_0_model='deepseek-chat',
+    agent_1_model='deepseek-reasoner',
+    agent_2_model='deepseek-chat',
+    agent_3_model='deepseek-reasoner',
+    synthesis_model='deepseek-reasoner',
+    default_model='deepseek-chat',
+    profile_name='balanced'
+)
+_PREMIUM_CONFIG = AgentModelConfig(
+    agent_0_model='deepseek-reasoner',
+    agent_1_model='deepseek-reasoner',
+    agent_2_model='deepseek-reasoner',
+    agent_3_model='deepseek-reasoner',
+    synthesis_model='deepseek-reasoner',
+    default_model='deepseek-reasoner',
+    profile_name='premium'
+)
+
+
+# The demo config has a fixed layout, so it is filled in from a template instead of going through PyYAML
+_DEMO_CONFIG_TEMPLATE = """\
+provider:
+  type: deepseek
+deepseek:
+  api_key: {api_key}
+  base_url: https://api.deepseek.com
+  model: deepseek-chat
+system_prompt: You are a helpful assistant.
+agent:
+  max_iterations: 3
+orchestrator:
+  parallel_agents: 4
+  task_timeout: 60
+  aggregation_strategy: consensus
+  budget_limit: {budget_limit}
+  question_generation_prompt: Generate questions
+  synthesis_prompt: Synthesize responses
+search:
+  max_results: 5
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _demo_config_bytes() -> bytes:
+    """Render the demo configuration once; every demo writes the same document."""
+    return _DEMO_CONFIG_TEMPLATE.format(
+        api_key='sk-16dc8f03dd4a4ae4835330cd78eb79bf',
+        budget_limit=0.25  # $0.25 budget limit
+    ).encode('utf-8')
+
 
 def create_demo_config():
     """Create a demo configuration file."""
-    config = {
-        'provider': {'type': 'deepseek'},
-        'deepseek': {
-            'api_key': 'sk-16dc8f03dd4a4ae4835330cd78eb79bf',
-            'base_url': 'https://api.deepseek.com',
-            'model': 'deepseek-chat'
-        },
-        'system_prompt': 'You are a helpful assistant.',
-        'agent': {'max_iterations': 3},
-        'orchestrator': {
-            'parallel_agents': 4,
-            'task_timeout': 60,
-            'aggregation_strategy': 'consensus',
-            'budget_limit': 0.25,  # $0.25 budget limit
-            'question_generation_prompt': 'Generate questions',
-            'synthesis_prompt': 'Synthesize responses'
-        },
-        'search': {'max_results': 5}
-    }
+    # A single write of the pre-encoded document; no buffered text file needed
+    fd, path = tempfile.mkstemp(suffix='.yaml')
+    try:
+        os.write(fd, _demo_config_bytes())
+    finally:
+        os.close(fd)
+    
+    return path
+
+
+@functools.lru_cache(maxsize=1)
+def _demo_model_manager() -> ModelConfigurationManager:
+    """Load the demo configuration once and share the manager across demos.
     
-    temp_config = tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False)
-    yaml.dump(config, temp_config)
-    temp_config.close()
+    Sharing the manager also shares its cache of available models.
+    """
+    config_path = create_demo_config()
+    try:
+        config_manager = ConfigurationManager()
+        config_manager.load_config(config_path)
+    finally:
+        os.unlink(config_path)
     
-    return temp_config.name
+    return ModelConfigurationManager(config_manager)
 
 
 def demo_configuration_testing():
@@ -50,57 +135,31 @@ def demo_configuration_testing():
     print("🧪 CONFIGURATION TESTING DEMO")
     print("=" * 50)
     
-    config_path = create_demo_config()
+    manager = _demo_model_manager()
     
-    try:
-        # Initialize manager
-        config_manager = ConfigurationManager()
-        config_manager.load_config(config_path)
-        manager = ModelConfigurationManager(config_manager)
+    # Create test configurations
+    test_configs = {
+        'Budget': _BUDGET_CONFIG,
+        'Mixed': _BALANCED_CONFIG
+    }
+    
+    for name, config in test_configs.items():
+        print(f"\n🔍 Testing {name} Configuration:")
+        print(f"   Agent 0: {config.agent_0_model}")
+        print(f"   Agent 1: {config.agent_1_model}")
+        print(f"   Synthesis: {config.synthesis_model}")
         
-        # Create test configurations
-        test_configs = {
-            'Budget': AgentModelConfig(
-                agent_0_model='deepseek-chat',
-                agent_1_model='deepseek-chat',
-                agent_2_model='deepseek-chat',
-                agent_3_model='deepseek-chat',
-                synthesis_model='deepseek-chat',
-                default_model='deepseek-chat',
-                profile_name='budget'
-            ),
-            'Mixed': AgentModelConfig(
-                agent_0_model='deepseek-chat',
-                agent_1_model='deepseek-reasoner',
-                agent_2_model='deepseek-chat',
-                agent_3_model='deepseek-reasoner',
-                synthesis_model='deepseek-reasoner',
-                default_model='deepseek-chat',
-                profile_name='mixed'
-            )
-        }
+        # Simulate test results (would normally test actual API connectivity)
+        print(f"   ✅ All models accessible")
+        print(f"   📊 Average response time: 1.2s")
         
-        for name, config in test_configs.items():
-            print(f"\n🔍 Testing {name} Configuration:")
-            print(f"   Agent 0: {config.agent_0_model}")
-            print(f"   Agent 1: {config.agent_1_model}")
-            print(f"   Synthesis: {config.synthesis_model}")
-            
-            # Simulate test results (would normally test actual API connectivity)
-            print(f"   ✅ All models accessible")
-            print(f"   📊 Average response time: 1.2s")
-            
-            # Get validation results
-            validation = manager.validate_configuration(config)
-            print(f"   ✅ Configuration valid: {validation['valid']}")
-            
-            if validation['cost_estimate']:
-                cost = validation['cost_estimate']
-                print(f"   💰 Estimated cost per query: ${cost.total_cost:.6f}")
-    
-    finally:
-        if os.path.exists(config_path):
-            os.unlink(config_path)
+        # Get validation results
+        validation = manager.validate_configuration(config)
+        print(f"   ✅ Configuration valid: {validation['valid']}")
+        
+        if validation['cost_estimate']:
+            cost = validation['cost_estimate']
+            print(f"   💰 Estimated cost per query: ${cost.total_cost:.6f}")
 
 
 def demo_cost_monitoring():
@@ -130,15 +189,17 @@ def demo_cost_monitoring():
     
     print("\n🔄 Simulating multi-agent execution:")
     
-    for agent_id, model, input_tokens, output_tokens, cost in agents_data:
+    # The running totals are known up front, so the monitor is not queried after each record
+    running_totals = itertools.accumulate(row[4] for row in agents_data)
+    
+    for (agent_id, model, input_tokens, output_tokens, cost), running_total in zip(agents_data, running_totals):
         agent_name = "Synthesis" if agent_id == -1 else f"Agent {agent_id}"
         print(f"   {agent_name} ({model}): ${cost:.6f}")
         
+        # Recorded one at a time so alerts show up next to the agent that crossed the threshold
         monitor.record_agent_cost(agent_id, model, input_tokens, output_tokens, cost)
         
-        # Show real-time stats
-        stats = monitor.get_real_time_stats()
-        print(f"     Running total: ${stats['current_total']:.6f}")
+        print(f"     Running total: ${running_total:.6f}")
     
     # Final summary
     summary = monitor.get_cost_summary()
@@ -159,74 +220,41 @@ def demo_configuration_comparison():
     print("\n📊 CONFIGURATION COMPARISON DEMO")
     print("=" * 50)
     
-    config_path = create_demo_config()
+    manager = _demo_model_manager()
     
-    try:
-        config_manager = ConfigurationManager()
-        config_manager.load_config(config_path)
-        manager = ModelConfigurationManager(config_manager)
-        
-        # Create different configurations
-        configs = [
-            AgentModelConfig(
-                agent_0_model='deepseek-chat',
-                agent_1_model='deepseek-chat',
-                agent_2_model='deepseek-chat',
-                agent_3_model='deepseek-chat',
-                synthesis_model='deepseek-chat',
-                default_model='deepseek-chat',
-                profile_name='budget'
-            ),
-            AgentModelConfig(
-                agent_0_model='deepseek-chat',
-                agent_1_model='deepseek-reasoner',
-                agent_2_model='deepseek-chat',
-                agent_3_model='deepseek-reasoner',
-                synthesis_model='deepseek-reasoner',
-                default_model='deepseek-chat',
-                profile_name='balanced'
-            ),
-            AgentModelConfig(
-                agent_0_model='deepseek-reasoner',
-                agent_1_model='deepseek-reasoner',
-                agent_2_model='deepseek-reasoner',
-                agent_3_model='deepseek-reasoner',
-                synthesis_model='deepseek-reasoner',
-                default_model='deepseek-reasoner',
-                profile_name='premium'
-            )
-        ]
-        
-        config_names = ['Budget', 'Balanced', 'Premium']
-        
-        # Create comparison report
-        print("🔍 Comparing configurations...")
-        
-        # Simulate comparison (would normally calculate actual costs)
-        simulated_costs = [0.002, 0.008, 0.025]  # Budget, Balanced, Premium
-        
-        print(f"\n📋 Configuration Comparison:")
-        for i, (name, config, cost) in enumerate(zip(config_names, configs, simulated_costs)):
-            print(f"\n{name} Configuration:")
-            print(f"   Profile: {config.profile_name}")
-            print(f"   Agent models: {config.agent_0_model}, {config.agent_1_model}")
-            print(f"   Synthesis model: {config.synthesis_model}")
-            print(f"   Estimated cost per query: ${cost:.6f}")
-            
-            # Show cost difference from budget
-            if i > 0:
-                diff = cost - simulated_costs[0]
-                print(f"   Cost vs Budget: +${diff:.6f} ({(diff/simulated_costs[0]*100):+.1f}%)")
-        
-        # Recommendations
-        print(f"\n💡 Recommendations:")
-        print(f"   • Budget: Best for high-volume, simple tasks")
-        print(f"   • Balanced: Good compromise for most use cases")
-        print(f"   • Premium: Best for complex reasoning tasks")
+    # Create different configurations
+    configs = [
+        _BUDGET_CONFIG,
+        _BALANCED_CONFIG,
+        _PREMIUM_CONFIG
+    ]
     
-    finally:
-        if os.path.exists(config_path):
-            os.unlink(config_path)
+    config_names = ['Budget', 'Balanced', 'Premium']
+    
+    # Create comparison report
+    print("🔍 Comparing configurations...")
+    
+    # Simulate comparison (would normally calculate actual costs)
+    simulated_costs = [0.002, 0.008, 0.025]  # Budget, Balanced, Premium
+    
+    print(f"\n📋 Configuration Comparison:")
+    for i, (name, config, cost) in enumerate(zip(config_names, configs, simulated_costs)):
+        print(f"\n{name} Configuration:")
+        print(f"   Profile: {config.profile_name}")
+        print(f"   Agent models: {config.agent_0_model}, {config.agent_1_model}")
+        print(f"   Synthesis model: {config.synthesis_model}")
+        print(f"   Estimated cost per query: ${cost:.6f}")
+        
+        # Show cost difference from budget
+        if i > 0:
+            diff = cost - simulated_costs[0]
+            print(f"   Cost vs Budget: +${diff:.6f} ({(diff/simulated_costs[0]*100):+.1f}%)")
+    
+    # Recommendations
+    print(f"\n💡 Recommendations:")
+    print(f"   • Budget: Best for high-volume, simple tasks")
+    print(f"   • Balanced: Good compromise for most use cases")
+    print(f"   • Premium: Best for complex reasoning tasks")
 
 
 def demo_export_import():
@@ -234,62 +262,55 @@ def demo_export_import():
     print("\n📤 EXPORT/IMPORT DEMO")
     print("=" * 50)
     
-    config_path = create_demo_config()
-    
+    manager = _demo_model_manager()
+    
+    # Create configuration to export
+    export_config = AgentModelConfig(
+        agent_0_model='deepseek-chat',
+        agent_1_model='deepseek-reasoner',
+        agent_2_model='deepseek-chat',
+        agent_3_model='deepseek-reasoner',
+        synthesis_model='deepseek-reasoner',
+        default_model='deepseek-chat',
+        profile_name='demo_export'
+    )
+    
+    print("📦 Exporting configuration...")
+    
+    # Export with sanitization
+    exported = manager.export_configuration_with_sanitization(
+        export_config,
+        include_costs=True,
+        sanitize_keys=True
+    )
+    
+    print(f"   ✅ Configuration exported")
+    print(f"   📅 Export timestamp: {exported['export_timestamp']}")
+    print(f"   🔒 API keys sanitized: {exported['requires_api_setup']}")
+    
+    # Save to temporary file
+    fd, export_path = tempfile.mkstemp(suffix='.json')
     try:
-        config_manager = ConfigurationManager()
-        config_manager.load_config(config_path)
-        manager = ModelConfigurationManager(config_manager)
-        
-        # Create configuration to export
-        export_config = AgentModelConfig(
-            agent_0_model='deepseek-chat',
-            agent_1_model='deepseek-reasoner',
-            agent_2_model='deepseek-chat',
-            agent_3_model='deepseek-reasoner',
-            synthesis_model='deepseek-reasoner',
-            default_model='deepseek-chat',
-            profile_name='demo_export'
-        )
-        
-        print("📦 Exporting configuration...")
-        
-        # Export with sanitization
-        exported = manager.export_configuration_with_sanitization(
-            export_config,
-            include_costs=True,
-            sanitize_keys=True
-        )
-        
-        print(f"   ✅ Configuration exported")
-        print(f"   📅 Export timestamp: {exported['export_timestamp']}")
-        print(f"   🔒 API keys sanitized: {exported['requires_api_setup']}")
-        
-        # Save to temporary file
-        export_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
-        json.dump(exported, export_file, indent=2)
-        export_file.close()
-        
-        print(f"   💾 Saved to: {export_file.name}")
-        
-        # Import configuration
-        print(f"\n📥 Importing configuration...")
-        
-        with open(export_file.name, 'r') as f:
-            import_data = json.load(f)
-        
-        imported_config = manager.import_configuration(import_data)
-        
-        print(f"   ✅ Configuration imported successfully")
-        print(f"   📋 Profile: {imported_config.profile_name}")
-        print(f"   🧠 Models match: {imported_config.agent_0_model == export_config.agent_0_model}")
-        
-        # Clean up
-        os.unlink(export_file.name)
-    
+        os.write(fd, _json_dumps_pretty(exported))
     finally:
-        if os.path.exists(config_path):
-            os.unlink(config_path)
+        os.close(fd)
+    
+    print(f"   💾 Saved to: {export_path}")
+    
+    # Import configuration
+    print(f"\n📥 Importing configuration...")
+    
+    with open(export_path, 'rb') as f:
+        import_data = _json_loads(f.read())
+    
+    imported_config = manager.import_configuration(import_data)
+    
+    print(f"   ✅ Configuration imported successfully")
+    print(f"   📋 Profile: {imported_config.profile_name}")
+    print(f"   🧠 Models match: {imported_config.agent_0_model == export_config.agent_0_model}")
+    
+    # Clean up
+    os.unlink(export_path)
 
 
 def demo_budget_management():
@@ -322,16 +343,13 @@ def demo_budget_management():
     print(f"\n🔄 Simulating costs across sessions:")
     
     for session_name, costs in session_costs.items():
-        monitor = sessions[session_name]
-        session_total = 0
-        
         print(f"\n   {session_name.title()} Session:")
-        for agent_id, model, input_tokens, output_tokens, cost in costs:
-            monitor.record_agent_cost(agent_id, model, input_tokens, output_tokens, cost)
-            session_total += cost
-            print(f"     Agent {agent_id} ({model}): ${cost:.4f}")
+        sessions[session_name].record_agent_costs(costs)
         
-        print(f"     Session total: ${session_total:.4f}")
+        # One write per session rather than one per agent
+        rows = [f"     Agent {agent_id} ({model}): ${cost:.4f}" for agent_id, model, _, _, cost in costs]
+        rows.append(f"     Session total: ${sum(row[4] for row in costs):.4f}")
+        print("\n".join(rows))
     
     # Global summary
     global_summary = budget_manager.get_global_summary()
@@ -352,16 +370,19 @@ def demo_real_time_monitoring():
     print("\n⏱️  REAL-TIME MONITORING DEMO")
     print("=" * 50)
     
-    import time
-    import threading
-    
     # Create monitor with real-time capabilities
     monitor = CostMonitor(budget_limit=0.10)
     
+    # Set by a cost listener so the watcher below wakes only when a cost is recorded
+    cost_recorded = threading.Event()
+    monitor.add_cost_listener(lambda delta: cost_recorded.set())
+    # Keeps the simulator's and the watcher's lines from running into each other
+    output_lock = threading.Lock()
+    
     print(f"🚀 Starting real-time monitoring...")
     
     # Start monitoring
-    monitor.start_monitoring(check_interval=1.0)
+    monitor.start_monitoring(check_interval=1.0 * DEMO_SLEEP_SCALE)
     
     # Simulate costs over time
     cost_schedule = [
@@ -373,22 +394,28 @@ def demo_real_time_monitoring():
     
     def simulate_costs():
         for delay, agent_id, model, input_tokens, output_tokens, cost in cost_schedule:
-            time.sleep(delay)
+            time.sleep(delay * DEMO_SLEEP_SCALE)
             monitor.record_agent_cost(agent_id, model, input_tokens, output_tokens, cost)
             
             # Show real-time stats
             stats = monitor.get_real_time_stats()
-            print(f"   Agent {agent_id} completed: ${cost:.4f} (Total: ${stats['current_total']:.4f})")
+            with output_lock:
+                print(f"   Agent {agent_id} completed: ${cost:.4f} (Total: ${stats['current_total']:.4f})")
     
     # Run simulation in background
     cost_thread = threading.Thread(target=simulate_costs, daemon=True)
     cost_thread.start()
     
-    # Monitor for a few seconds
-    for i in range(6):
-        time.sleep(1)
+    # Report each change until the simulation has finished
+    start = time.monotonic()
+    while cost_thread.is_alive() or cost_recorded.is_set():
+        if not cost_recorded.wait(timeout=1.0 * DEMO_SLEEP_SCALE):
+            continue
+        cost_recorded.clear()
+        elapsed = (time.monotonic() - start) / DEMO_SLEEP_SCALE
         stats = monitor.get_real_time_stats()
-        print(f"⏰ {i+1}s: Total=${stats['current_total']:.4f}, Status={stats['budget_status']}")
+        with output_lock:
+            print(f"⏰ {elapsed:.0f}s: Total=${stats['current_total']:.4f}, Status={stats['budget_status']}")
     
     # Wait for simulation to complete
     cost_thread.join()
@@ -404,6 +431,58 @@ def demo_real_time_monitoring():
     print(f"   Session duration: {final_summary['session_duration_minutes']:.1f} minutes")
 
 
+class _ThreadStdout:
+    """Stand-in for sys.stdout that sends a thread's writes to its own buffer while capturing."""
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+    
+    @contextlib.contextmanager
+    def capture(self):
+        buffer = self._local.buffer = io.StringIO()
+        try:
+            yield buffer
+        finally:
+            del self._local.buffer
+    
+    def write(self, text):
+        return getattr(self._local, 'buffer', self._stream).write(text)
+    
+    def flush(self):
+        getattr(self._local, 'buffer', self._stream).flush()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _run_captured(stdout: _ThreadStdout, demo):
+    """Run a demo in a worker thread, returning its output and any exception it raised."""
+    with stdout.capture() as buffer:
+        try:
+            demo()
+        except Exception as e:
+            return buffer.getvalue(), e
+        return buffer.getvalue(), None
+
+
+def _run_concurrently(demos):
+    """Run independent demos in parallel and write their output in the given order."""
+    stdout = _ThreadStdout(sys.stdout)
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=len(demos)) as executor:
+            results = [executor.submit(_run_captured, stdout, demo) for demo in demos]
+    finally:
+        sys.stdout = stdout._stream
+    
+    for future in results:
+        output, error = future.result()
+        sys.stdout.write(output)
+        if error is not None:
+            raise error
+
+
 def main():
     """Run all advanced features demos."""
     print("🚀 ADVANCED MULTI-MODEL FEATURES DEMO")
@@ -412,11 +491,11 @@ def main():
     print("=" * 60)
     
     try:
-        demo_configuration_testing()
-        demo_cost_monitoring()
-        demo_configuration_comparison()
-        demo_export_import()
-        demo_budget_management()
+        # Load the shared manager up front so the worker threads do not race to create it
+        _demo_model_manager()
+        _run_concurrently((demo_configuration_testing, demo_cost_monitoring, demo_configuration_comparison,
+                           demo_export_import, demo_budget_management))
+        # Run on its own afterwards: this demo shows output as costs arrive
         demo_real_time_monitoring()
         
         print("\n" + "=" * 60)
@@ -430,7 +509,6 @@ def main():
         
     except Exception as e:
         print(f"\n❌ Demo failed: {e}")
-        import traceback
         traceback.print_exc()
 
 
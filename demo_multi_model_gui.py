@@ -12,6 +12,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from gui.multi_model_config_panel import MultiModelConfigPanel
+from gui.theme_manager import use_preferred_ttk_theme
 
 
 def main():
@@ -25,11 +26,7 @@ def main():
     style = ttk.Style()
     
     # Try to use a more modern theme if available
-    available_themes = style.theme_names()
-    if 'aqua' in available_themes:  # macOS native theme
-        style.theme_use('aqua')
-    elif 'clam' in available_themes:  # Modern alternative
-        style.theme_use('clam')
+    use_preferred_ttk_theme(style)
     
     try:
         # Create the multi-model configuration panel
@@ -7,31 +7,36 @@ import yaml
 import tempfile
 import os
 from orchestrator import TaskOrchestrator
+from config_manager import YamlDumper
 from model_config.data_models import AgentModelConfig
 
 
-def create_test_config_with_multi_model():
-    """Create a test configuration with multi-model setup."""
-    config = {
-        'provider': {'type': 'deepseek'},
-        'deepseek': {
-            'api_key': 'sk-16dc8f03dd4a4ae4835330cd78eb79bf',
-            'base_url': 'https://api.deepseek.com',
-            'model': 'deepseek-chat'
-        },
-        'system_prompt': '''You are a helpful research assistant. When users ask questions that require 
+def _render_config(config):
+    """Dump a demo configuration to YAML bytes."""
+    return yaml.dump(config, Dumper=YamlDumper, default_flow_style=False).encode('utf-8')
+
+
+# The demo configurations never change, so render them once at import
+_MULTI_MODEL_CONFIG_BYTES = _render_config({
+    'provider': {'type': 'deepseek'},
+    'deepseek': {
+        'api_key': 'sk-16dc8f03dd4a4ae4835330cd78eb79bf',
+        'base_url': 'https://api.deepseek.com',
+        'model': 'deepseek-chat'
+    },
+    'system_prompt': '''You are a helpful research assistant. When users ask questions that require 
 current information or web search, use the search tool and all other tools available to find relevant 
 information and provide comprehensive answers based on the results.
 
 IMPORTANT: When you have fully satisfied the user's request and provided a complete answer, 
 you MUST call the mark_task_complete tool with a summary of what was accomplished and 
 a final message for the user. This signals that the task is finished.''',
-        'agent': {'max_iterations': 5},
-        'orchestrator': {
-            'parallel_agents': 2,
-            'task_timeout': 60,
-            'aggregation_strategy': 'consensus',
-            'question_generation_prompt': '''You are an orchestrator that needs to create {num_agents} different questions to thoroughly analyze this topic from multiple angles.
+    'agent': {'max_iterations': 5},
+    'orchestrator': {
+        'parallel_agents': 2,
+        'task_timeout': 60,
+        'aggregation_strategy': 'consensus',
+        'question_generation_prompt': '''You are an orchestrator that needs to create {num_agents} different questions to thoroughly analyze this topic from multiple angles.
 
 Original user query: {user_input}
 
@@ -42,7 +47,7 @@ Return your response as a JSON array of strings, like this:
 ["question 1", "question 2"]
 
 Only return the JSON array, nothing else.''',
-            'synthesis_prompt': '''You have {num_responses} different AI agents that analyzed the same query from different perspectives. 
+        'synthesis_prompt': '''You have {num_responses} different AI agents that analyzed the same query from different perspectives. 
 Your job is to synthesize their responses into ONE comprehensive final answer.
 
 Here are all the agent responses:
@@ -52,28 +57,56 @@ Here are all the agent responses:
 IMPORTANT: Just synthesize these into ONE final comprehensive answer that combines the best information from all agents. 
 Do NOT call mark_task_complete or any other tools. Do NOT mention that you are synthesizing multiple responses. 
 Simply provide the final synthesized answer directly as your response.'''
-        },
-        'search': {
-            'max_results': 5,
-            'user_agent': 'Mozilla/5.0 (compatible; DeepSeek Agent)'
-        },
-        'multi_model': {
-            'agent_0_model': 'deepseek-chat',
-            'agent_1_model': 'deepseek-reasoner',
-            'agent_2_model': 'deepseek-chat',
-            'agent_3_model': 'deepseek-reasoner',
-            'synthesis_model': 'deepseek-reasoner',
-            'default_model': 'deepseek-chat',
-            'profile_name': 'mixed'
-        }
+    },
+    'search': {
+        'max_results': 5,
+        'user_agent': 'Mozilla/5.0 (compatible; DeepSeek Agent)'
+    },
+    'multi_model': {
+        'agent_0_model': 'deepseek-chat',
+        'agent_1_model': 'deepseek-reasoner',
+        'agent_2_model': 'deepseek-chat',
+        'agent_3_model': 'deepseek-reasoner',
+        'synthesis_model': 'deepseek-reasoner',
+        'default_model': 'deepseek-chat',
+        'profile_name': 'mixed'
     }
+})
+
+_BASIC_CONFIG_BYTES = _render_config({
+    'provider': {'type': 'deepseek'},
+    'deepseek': {
+        'api_key': 'sk-16dc8f03dd4a4ae4835330cd78eb79bf',
+        'base_url': 'https://api.deepseek.com',
+        'model': 'deepseek-chat'
+    },
+    'system_prompt': 'Test prompt',
+    'agent': {'max_iterations': 3},
+    'orchestrator': {
+        'parallel_agents': 2,
+        'task_timeout': 30,
+        'aggregation_strategy': 'consensus',
+        'question_generation_prompt': 'Generate questions',
+        'synthesis_prompt': 'Synthesize responses'
+    },
+    'search': {'max_results': 5}
+})
+
+
+def _write_temp_config(config_bytes):
+    """Write a pre-rendered configuration to a temporary file and return its path."""
+    fd, path = tempfile.mkstemp(suffix='.yaml')
+    try:
+        os.write(fd, config_bytes)
+    finally:
+        os.close(fd)
     
-    # Create temporary config file
-    temp_config = tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False)
-    yaml.dump(config, temp_config)
-    temp_config.close()
-    
-    return temp_config.name
+    return path
+
+
+def create_test_config_with_multi_model():
+    """Create a test configuration with multi-model setup."""
+    return _write_temp_config(_MULTI_MODEL_CONFIG_BYTES)
 
 
 def demo_multi_model_orchestrator():
@@ -141,39 +174,20 @@ def demo_multi_model_orchestrator():
     
     finally:
         # Clean up
-        if os.path.exists(config_path):
+        try:
             os.unlink(config_path)
+        except FileNotFoundError:
+            pass
 
 
 def demo_without_multi_model():
     """Demonstrate orchestrator without multi-model configuration."""
     print("\n🔄 Testing without multi-model configuration...")
     
-    config = {
-        'provider': {'type': 'deepseek'},
-        'deepseek': {
-            'api_key': 'sk-16dc8f03dd4a4ae4835330cd78eb79bf',
-            'base_url': 'https://api.deepseek.com',
-            'model': 'deepseek-chat'
-        },
-        'system_prompt': 'Test prompt',
-        'agent': {'max_iterations': 3},
-        'orchestrator': {
-            'parallel_agents': 2,
-            'task_timeout': 30,
-            'aggregation_strategy': 'consensus',
-            'question_generation_prompt': 'Generate questions',
-            'synthesis_prompt': 'Synthesize responses'
-        },
-        'search': {'max_results': 5}
-    }
-    
-    temp_config = tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False)
-    yaml.dump(config, temp_config)
-    temp_config.close()
+    config_path = _write_temp_config(_BASIC_CONFIG_BYTES)
     
     try:
-        orchestrator = TaskOrchestrator(temp_config.name, silent=False)
+        orchestrator = TaskOrchestrator(config_path, silent=False)
         
         if orchestrator.multi_model_config:
             print("❌ Unexpected: Multi-model config found")
@@ -189,8 +203,10 @@ def demo_without_multi_model():
         print(f"   Multi-model enabled: {summary['multi_model_enabled']}")
         
     finally:
-        if os.path.exists(temp_config.name):
-            os.unlink(temp_config.name)
+        try:
+            os.unlink(config_path)
+        except FileNotFoundError:
+            pass
 
 
 if __name__ == "__main__":
@@ -14,7 +14,9 @@ from tkinter import ttk
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from config_manager import YamlDumper
 from gui.settings_panel import SettingsPanel
+from gui.theme_manager import use_preferred_ttk_theme
 
 
 def create_demo_config():
@@ -46,7 +48,7 @@ def create_demo_config():
     
     # Create temporary config file
     with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-        yaml.dump(demo_config, f, default_flow_style=False)
+        yaml.dump(demo_config, f, Dumper=YamlDumper, default_flow_style=False)
         return f.name
 
 
@@ -76,10 +78,7 @@ def main():
         
         # Configure style
         style = ttk.Style()
-        if 'aqua' in style.theme_names():
-            style.theme_use('aqua')
-        elif 'clam' in style.theme_names():
-            style.theme_use('clam')
+        use_preferred_ttk_theme(style)
         
         # Add title
         title_frame = ttk.Frame(root)
@@ -147,8 +146,11 @@ def main():
         
     finally:
         # Clean up demo config file
-        if os.path.exists(demo_config_path):
+        try:
             os.unlink(demo_config_path)
+        except FileNotFoundError:
+            pass
+        else:
             print(f"\n🧹 Cleaned up demo config: {demo_config_path}")
 
 
@@ -6,48 +6,97 @@ Fix script for GUI issues:
 3. OpenRouter model list expansion
 """
 
+import ast
 import os
+import re
 import sys
 import requests
 import json
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from config_manager import write_file_atomic
+from llm_cache import DEFAULT_CACHE_DIR
 
-def fix_api_key_validation():
-    """Fix API key validation in settings_panel.py"""
-    print("🔧 Fixing API key validation...")
+# orjson parses the large model listing faster; fall back to stdlib json when unavailable
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+OPENROUTER_MODELS_URL = "https://openrouter.ai/api/v1/models"
+OPENROUTER_MODELS_CACHE = os.path.join(DEFAULT_CACHE_DIR, "openrouter_models.json")
+
+# Used when the model list cannot be fetched
+FALLBACK_OPENROUTER_MODELS = (
+    "anthropic/claude-3.5-sonnet",
+    "anthropic/claude-3-opus",
+    "anthropic/claude-3-sonnet", 
+    "anthropic/claude-3-haiku",
+    "openai/gpt-4-turbo",
+    "openai/gpt-4",
+    "openai/gpt-4-mini",
+    "openai/gpt-3.5-turbo",
+    "google/gemini-2.0-flash-001",
+    "google/gemini-pro",
+    "meta-llama/llama-3.1-405b-instruct",
+    "meta-llama/llama-3.1-70b-instruct",
+    "meta-llama/llama-3.1-8b-instruct",
+    "mistralai/mistral-large",
+    "mistralai/mistral-medium",
+    "mistralai/mistral-small",
+    "cohere/command-r-plus",
+    "cohere/command-r",
+    "perplexity/llama-3.1-sonar-large-128k-online",
+    "perplexity/llama-3.1-sonar-small-128k-online"
+)
+
+# The "models": [...] list inside the "openrouter" provider entry of settings_panel.py
+OPENROUTER_MODELS_PATTERN = re.compile(rb'("openrouter"\s*:\s*\{[^}]*?"models"\s*:\s*)\[[^\]]*\]', re.DOTALL)
+
+# Reuse one pooled connection (and its TLS session) for every request to the API
+_session = requests.Session()
+
+def patch_file(path: str, fixes: List[Callable[[bytes, List[str]], bytes]]) -> List[str]:
+    """Apply each fix to the file contents, reading and writing the file once.
     
-    settings_file = "gui/settings_panel.py"
+    Returns the messages the fixes reported, in order.
+    """
+    # The patches only touch ASCII source, so work on the raw bytes without decoding
+    original = Path(path).read_bytes()
     
-    # Read current file
-    with open(settings_file, 'r') as f:
-        content = f.read()
+    log = []
+    content = original
+    for fix in fixes:
+        content = fix(content, log)
     
-    # Fix validation method - make it less strict for DeepSeek
-    old_validation = '''    def validate_single_api_key(self, provider: str, api_key: str) -> bool:
-        """Validate a single API key"""
-        if not api_key:
-            raise ValueError("API key is empty")
-        
-        # Create temporary config for validation
-        temp_config = ProviderConfig(
-            provider_type=provider,
-            api_key=api_key,
-            base_url=self.providers[provider]['base_url'],
-            model=self.providers[provider]['models'][0]
-        )
-        
-        try:
-            # Try to create client (this validates the configuration)
-            client = ProviderClientFactory.create_client(temp_config)
-            
-            # For a more thorough validation, we could make a test API call here
-            # but for now, just creating the client is sufficient
-            return True
-            
-        except Exception as e:
-            raise ValueError(f"Invalid API key: {str(e)}")'''
+    if content != original:
+        write_file_atomic(path, content)
+    return log
+
+def _find_method(tree: ast.AST, name: str) -> Optional[ast.FunctionDef]:
+    """Return the first function definition with the given name"""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name == name:
+            return node
+    return None
+
+def patch_files_concurrently(jobs: List[Tuple[str, List[Callable[[bytes, List[str]], bytes]]]]) -> List[List[str]]:
+    """Patch independent files in parallel and return each file's messages in job order.
     
-    new_validation = '''    def validate_single_api_key(self, provider: str, api_key: str) -> bool:
+    The OpenRouter model fetch dominates the run, so the other files are
+    patched while it waits on the network.
+    """
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        return list(executor.map(lambda job: patch_file(*job), jobs))
+
+def fix_api_key_validation(content: bytes, log: List[str]) -> bytes:
+    """Fix API key validation in settings_panel.py"""
+    log.append("🔧 Fixing API key validation...")
+    
+    # Fix validation method - make it less strict for DeepSeek
+    new_validation = b'''    def validate_single_api_key(self, provider: str, api_key: str) -> bool:
         """Validate a single API key"""
         if not api_key:
             raise ValueError("API key is empty")
@@ -68,124 +117,115 @@ def fix_api_key_validation():
         # Full API validation can be done when actually using the key
         return True'''
     
-    if old_validation in content:
-        content = content.replace(old_validation, new_validation)
-        
-        with open(settings_file, 'w') as f:
-            f.write(content)
-        print("✅ Fixed API key validation")
+    # Locate the method by parsing the module, so formatting changes do not hide it
+    try:
+        current = _find_method(ast.parse(content), "validate_single_api_key")
+    except SyntaxError as e:
+        log.append(f"⚠️  Could not parse settings panel: {e}")
+        return content
+    
+    # Wrap the indented method in a class so it parses on its own
+    replacement = ast.parse(b"class _:\n" + new_validation).body[0].body[0]
+    if current is None:
+        log.append("⚠️  API key validation method not found")
+    elif ast.dump(current) == ast.dump(replacement):
+        log.append("⚠️  API key validation already modified")
     else:
-        print("⚠️  API key validation method not found or already modified")
+        # Splice the new source over the method's lines, leaving the rest of the file untouched
+        lines = content.splitlines(keepends=True)
+        lines[current.lineno - 1:current.end_lineno] = [new_validation + b"\n"]
+        content = b"".join(lines)
+        log.append("✅ Fixed API key validation")
+    
+    return content
+
+def _load_models_cache() -> Optional[Dict[str, Any]]:
+    """Read the cached {"etag": ..., "models": [...]} listing, if any"""
+    try:
+        with open(OPENROUTER_MODELS_CACHE, 'rb') as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+def _save_models_cache(etag: str, models: List[str]) -> None:
+    """Write the listing to the cache file atomically"""
+    os.makedirs(os.path.dirname(OPENROUTER_MODELS_CACHE), exist_ok=True)
+    write_file_atomic(OPENROUTER_MODELS_CACHE, json.dumps({"etag": etag, "models": models}).encode('utf-8'))
 
-def get_openrouter_models() -> List[str]:
-    """Fetch OpenRouter models from their API"""
-    print("🔧 Fetching OpenRouter models...")
+def get_openrouter_models(log: List[str]) -> List[str]:
+    """Fetch OpenRouter models from their API, reporting progress to log"""
+    log.append("🔧 Fetching OpenRouter models...")
     
     try:
+        # Revalidate the cached listing so an unchanged catalog comes back as an empty 304
+        cached = _load_models_cache()
+        headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+        
         # OpenRouter models endpoint
-        response = requests.get("https://openrouter.ai/api/v1/models", timeout=10)
+        response = _session.get(OPENROUTER_MODELS_URL, headers=headers, timeout=10)
+        if response.status_code == 304:
+            models = cached["models"]
+            log.append(f"✅ OpenRouter models unchanged, using {len(models)} cached models")
+            return models
         response.raise_for_status()
         
-        models_data = response.json()
-        models = []
+        # Parse the raw body directly instead of letting requests guess its encoding
+        models_data = _json_loads(response.content)
         
-        # Extract model IDs and sort them
-        for model in models_data.get('data', []):
-            model_id = model.get('id', '')
-            if model_id:
-                models.append(model_id)
+        # Extract unique model IDs sorted alphabetically
+        models = sorted({model['id'] for model in models_data.get('data', ()) if model.get('id')})
         
-        # Sort models alphabetically
-        models.sort()
+        etag = response.headers.get("ETag")
+        if etag:
+            try:
+                _save_models_cache(etag, models)
+            except OSError as e:
+                log.append(f"⚠️  Could not cache OpenRouter models: {e}")
         
-        print(f"✅ Fetched {len(models)} OpenRouter models")
+        log.append(f"✅ Fetched {len(models)} OpenRouter models")
         return models
         
     except Exception as e:
-        print(f"⚠️  Failed to fetch OpenRouter models: {e}")
+        log.append(f"⚠️  Failed to fetch OpenRouter models: {e}")
         # Return expanded default list
-        return [
-            "anthropic/claude-3.5-sonnet",
-            "anthropic/claude-3-opus",
-            "anthropic/claude-3-sonnet", 
-            "anthropic/claude-3-haiku",
-            "openai/gpt-4-turbo",
-            "openai/gpt-4",
-            "openai/gpt-4-mini",
-            "openai/gpt-3.5-turbo",
-            "google/gemini-2.0-flash-001",
-            "google/gemini-pro",
-            "meta-llama/llama-3.1-405b-instruct",
-            "meta-llama/llama-3.1-70b-instruct",
-            "meta-llama/llama-3.1-8b-instruct",
-            "mistralai/mistral-large",
-            "mistralai/mistral-medium",
-            "mistralai/mistral-small",
-            "cohere/command-r-plus",
-            "cohere/command-r",
-            "perplexity/llama-3.1-sonar-large-128k-online",
-            "perplexity/llama-3.1-sonar-small-128k-online"
-        ]
+        return list(FALLBACK_OPENROUTER_MODELS)
 
-def fix_openrouter_models():
+def fix_openrouter_models(content: bytes, log: List[str]) -> bytes:
     """Fix OpenRouter model list in settings_panel.py"""
-    print("🔧 Fixing OpenRouter model list...")
-    
-    settings_file = "gui/settings_panel.py"
+    log.append("🔧 Fixing OpenRouter model list...")
     
     # Get expanded model list
-    openrouter_models = get_openrouter_models()
-    
-    # Read current file
-    with open(settings_file, 'r') as f:
-        content = f.read()
-    
-    # Find and replace the OpenRouter models section
-    old_models_start = '"openrouter": {\n                "name": "OpenRouter", \n                "base_url": "https://openrouter.ai/api/v1",\n                "models": ['
-    old_models_end = '                ]\n            }'
+    openrouter_models = get_openrouter_models(log)
     
-    # Create new models list
-    models_str = ',\n                    '.join([f'"{model}"' for model in openrouter_models])
-    new_models_section = f'"openrouter": {{\n                "name": "OpenRouter", \n                "base_url": "https://openrouter.ai/api/v1",\n                "models": [\n                    {models_str}\n                ]\n            }}'
+    # Encode the list in one call, then indent it to sit inside the providers dict
+    models_list = json.dumps(openrouter_models, indent=4).replace('\n', '\n' + ' ' * 16).encode('ascii')
     
-    # Find the section to replace
-    start_idx = content.find(old_models_start)
-    if start_idx != -1:
-        end_idx = content.find(old_models_end, start_idx) + len(old_models_end)
-        if end_idx > start_idx:
-            # Replace the section
-            content = content[:start_idx] + new_models_section + content[end_idx:]
-            
-            with open(settings_file, 'w') as f:
-                f.write(content)
-            print(f"✅ Updated OpenRouter models list with {len(openrouter_models)} models")
-        else:
-            print("⚠️  Could not find end of OpenRouter models section")
+    # Replace the OpenRouter models list
+    content, count = OPENROUTER_MODELS_PATTERN.subn(lambda match: match.group(1) + models_list, content, count=1)
+    if count:
+        log.append(f"✅ Updated OpenRouter models list with {len(openrouter_models)} models")
     else:
-        print("⚠️  Could not find OpenRouter models section")
+        log.append("⚠️  Could not find OpenRouter models section")
+    
+    return content
 
-def fix_duplicate_responses():
-    """Fix duplicate responses issue in agent execution"""
-    print("🔧 Fixing duplicate responses...")
+def fix_duplicate_callbacks(content: bytes, log: List[str]) -> bytes:
+    """Fix duplicate responses issue in chat_interface.py"""
+    log.append("🔧 Fixing duplicate responses...")
     
     # The issue might be in the agent.py run method or in the GUI callback handling
     # Let's check if there are multiple callback registrations
     
-    chat_file = "gui/chat_interface.py"
-    
-    with open(chat_file, 'r') as f:
-        content = f.read()
-    
     # Look for potential duplicate callback issues
     # The issue might be that callbacks are being registered multiple times
     
     # Fix: Ensure callbacks are cleared before setting new ones
-    old_callback_setup = '''            # Set up callbacks
+    old_callback_setup = b'''            # Set up callbacks
             self.agent_manager.set_completion_callback(self.on_agent_completion)
             if self.current_mode == "heavy":
                 self.agent_manager.set_progress_callback(self.on_progress_update)'''
     
-    new_callback_setup = '''            # Clear any existing callbacks first
+    new_callback_setup = b'''            # Clear any existing callbacks first
             self.agent_manager.set_completion_callback(None)
             self.agent_manager.set_progress_callback(None)
             
@@ -195,37 +235,31 @@ def fix_duplicate_responses():
                 self.agent_manager.set_progress_callback(self.on_progress_update)'''
     
     if old_callback_setup in content:
-        content = content.replace(old_callback_setup, new_callback_setup)
-        
-        with open(chat_file, 'w') as f:
-            f.write(content)
-        print("✅ Fixed callback handling to prevent duplicates")
+        content = content.replace(old_callback_setup, new_callback_setup, 1)
+        log.append("✅ Fixed callback handling to prevent duplicates")
     else:
-        print("⚠️  Callback setup not found or already modified")
-    
-    # Also check agent_manager for potential issues
-    agent_manager_file = "gui/agent_manager.py"
-    
-    with open(agent_manager_file, 'r') as f:
-        am_content = f.read()
+        log.append("⚠️  Callback setup not found or already modified")
     
+    return content
+
+def fix_completion_callback(content: bytes, log: List[str]) -> bytes:
+    """Ensure the agent manager calls the completion callback only once"""
     # Ensure completion callback is only called once
-    old_completion = '''            if self.completion_callback:
+    old_completion = b'''            if self.completion_callback:
                 self.completion_callback(result)'''
     
-    new_completion = '''            if self.completion_callback:
+    new_completion = b'''            if self.completion_callback:
                 callback = self.completion_callback
                 self.completion_callback = None  # Clear to prevent duplicate calls
                 callback(result)'''
     
-    if old_completion in am_content:
-        am_content = am_content.replace(old_completion, new_completion)
-        
-        with open(agent_manager_file, 'w') as f:
-            f.write(am_content)
-        print("✅ Fixed agent manager completion callback")
+    if old_completion in content:
+        content = content.replace(old_completion, new_completion, 1)
+        log.append("✅ Fixed agent manager completion callback")
     else:
-        print("⚠️  Agent manager completion callback not found or already modified")
+        log.append("⚠️  Agent manager completion callback not found or already modified")
+    
+    return content
 
 def main():
     """Main fix function"""
@@ -238,17 +272,15 @@ def main():
         sys.exit(1)
     
     try:
-        # Fix 1: API key validation
-        fix_api_key_validation()
-        print()
-        
-        # Fix 2: OpenRouter models
-        fix_openrouter_models()
-        print()
-        
-        # Fix 3: Duplicate responses
-        fix_duplicate_responses()
-        print()
+        # Each file is read and written once, with all of its fixes applied in between
+        outputs = patch_files_concurrently([
+            # Fixes 1 and 2: API key validation and OpenRouter models
+            ("gui/settings_panel.py", [fix_api_key_validation, fix_openrouter_models]),
+            # Fix 3: Duplicate responses
+            ("gui/chat_interface.py", [fix_duplicate_callbacks]),
+            ("gui/agent_manager.py", [fix_completion_callback])
+        ])
+        sys.stdout.write("".join(f"{message}\n" for log in outputs for message in log))
         
         print("=" * 50)
         print("✅ All fixes completed!")
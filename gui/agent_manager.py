@@ -4,24 +4,72 @@ Handles integration with UniversalAgent and TaskOrchestrator systems.
 """
 
 import threading
-import time
-import yaml
+import types
 import os
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, Optional, Callable, Any, Sequence
 from dataclasses import dataclass
 from datetime import datetime
 
 # Import existing agent systems
 import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
 from agent import UniversalAgent
 from orchestrator import TaskOrchestrator
-from config_manager import ConfigurationManager
+from config_manager import ConfigurationManager, DATACLASS_SLOTS, write_yaml_atomic
 from provider_factory import ProviderClientFactory
 
 
-@dataclass
+class AgentExecutionError(RuntimeError):
+    """Single agent or heavy mode run failed; the original error is the __cause__"""
+    pass
+
+
+class ConfigUpdateError(RuntimeError):
+    """Writing the provider configuration failed; the original error is the __cause__"""
+    pass
+
+
+# Per-provider settings written by update_config and models offered in the GUI
+_PROVIDER_BASE_URLS = {
+    "deepseek": "https://api.deepseek.com",
+    "openrouter": "https://openrouter.ai/api/v1"
+}
+_PROVIDER_MODELS = {
+    "deepseek": ("deepseek-chat", "deepseek-reasoner"),
+    "openrouter": (
+        "anthropic/claude-3.5-sonnet",
+        "openai/gpt-4-turbo",
+        "openai/gpt-4",
+        "google/gemini-2.0-flash-001",
+        "meta-llama/llama-3.1-405b-instruct"
+    )
+}
+
+# Progress bars only depend on the status, so build each one once
+_STATUS_BARS = {
+    "QUEUED": "○ " + "·" * 70,
+    "INITIALIZING...": "◐ " + "·" * 70,
+    # Animated processing bar
+    "PROCESSING...": "● " + ":" * 10 + "·" * 60,
+    "COMPLETED": "● " + ":" * 70
+}
+# Failed statuses carry the error message, but the bar is the same for all of them
+_FAILED_BAR = "✗ " + "×" * 70
+_DEFAULT_BAR = "◐ " + "·" * 70
+
+
+def progress_bar_for(status: str) -> str:
+    """Return the progress bar shown for an agent status"""
+    bar = _STATUS_BARS.get(status)
+    if bar is not None:
+        return bar
+    return _FAILED_BAR if status.startswith("FAILED") else _DEFAULT_BAR
+
+
+@dataclass(**DATACLASS_SLOTS)
 class AgentProgress:
     """Progress information for Heavy Mode agents"""
     agent_id: int
@@ -45,19 +93,39 @@ class AgentManager:
         self.progress_callback = None
         self.completion_callback = None
         
+        # Single mode agent, reused until the config file changes
+        self._single_agent: Optional[UniversalAgent] = None
+        self._single_agent_stat = None
+        
         # Heavy mode components
         self.orchestrator = None
         self.progress_monitor_thread = None
         self.agent_progress = {}
+        # Read-only view handed to progress callbacks instead of a fresh copy per update
+        self._progress_view = types.MappingProxyType(self.agent_progress)
+        # Set by the orchestrator on every status change so the monitor only wakes when needed
+        self._progress_changed = threading.Event()
+        
+        # (mtime, size) of the config file when self.config_manager.config was last in sync with it
+        self._config_stat = None
+        # Serializes config reloads and read-modify-write updates
+        self._config_lock = threading.Lock()
         
         # Load initial configuration
         self.reload_config()
     
+    def _read_config_stat(self):
+        stat = os.stat(self.config_path)
+        return stat.st_mtime_ns, stat.st_size
+    
     def reload_config(self):
         """Reload configuration from file"""
         try:
-            self.config_manager.load_config(self.config_path)
-            self.provider_config = self.config_manager.get_provider_config()
+            with self._config_lock:
+                # Stat before loading so a write in between is seen as a change next time
+                self._config_stat = self._read_config_stat()
+                self.config_manager.load_config(self.config_path)
+                self.provider_config = self.config_manager.get_provider_config()
         except Exception as e:
             print(f"Error loading configuration: {e}")
             raise
@@ -65,58 +133,66 @@ class AgentManager:
     def update_config(self, provider: str, model: str, api_key: str):
         """Update configuration with new provider/model/API key"""
         try:
-            # Load existing config
-            config = {}
-            if os.path.exists(self.config_path):
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f) or {}
-            
-            # Update provider selection
-            config['provider'] = {'type': provider}
-            
-            # Update provider-specific configuration
-            if provider == "deepseek":
-                config['deepseek'] = {
-                    'api_key': api_key,
-                    'base_url': "https://api.deepseek.com",
-                    'model': model
-                }
-            elif provider == "openrouter":
-                config['openrouter'] = {
-                    'api_key': api_key,
-                    'base_url': "https://openrouter.ai/api/v1",
-                    'model': model
-                }
-            
-            # Save configuration
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, default_flow_style=False, allow_unicode=True)
-            
-            # Reload configuration
-            self.reload_config()
-            
+            with self._config_lock:
+                # Start from the loaded config unless the file changed on disk since it was read.
+                # Only top-level keys are replaced, so a shallow copy keeps the loaded config
+                # untouched until the write succeeds
+                config = {}
+                if os.path.exists(self.config_path):
+                    if self.config_manager.config and self._config_stat == self._read_config_stat():
+                        config = dict(self.config_manager.config)
+                    else:
+                        config = dict(self.config_manager.load_config(self.config_path) or {})
+                
+                # Update provider selection
+                config['provider'] = {'type': provider}
+                
+                # Update provider-specific configuration
+                base_url = _PROVIDER_BASE_URLS.get(provider)
+                if base_url:
+                    config[provider] = {
+                        'api_key': api_key,
+                        'base_url': base_url,
+                        'model': model
+                    }
+                
+                # Save configuration; readers never see a partially written file
+                write_yaml_atomic(self.config_path, config)
+                
+                # Use the config just written instead of parsing the file again
+                self._config_stat = self._read_config_stat()
+                self.config_manager.config = config
+                self.config_manager.config_path = self.config_path
+                self.provider_config = self.config_manager.get_provider_config()
+                
         except Exception as e:
-            raise Exception(f"Failed to update configuration: {str(e)}")
+            raise ConfigUpdateError(f"Failed to update configuration: {e}") from e
     
-    def get_available_models(self, provider: str) -> List[str]:
-        """Get available models for a provider"""
-        providers = {
-            "deepseek": ["deepseek-chat", "deepseek-reasoner"],
-            "openrouter": [
-                "anthropic/claude-3.5-sonnet",
-                "openai/gpt-4-turbo",
-                "openai/gpt-4",
-                "google/gemini-2.0-flash-001",
-                "meta-llama/llama-3.1-405b-instruct"
-            ]
-        }
-        return providers.get(provider, [])
+    def get_available_models(self, provider: str) -> Sequence[str]:
+        """Get available models for a provider (a shared tuple; copy it if you need a list)"""
+        return _PROVIDER_MODELS.get(provider, ())
     
     def get_provider_info(self) -> Dict[str, Any]:
         """Get current provider information"""
         try:
-            temp_agent = UniversalAgent(config_path=self.config_path, silent=True)
-            return temp_agent.get_provider_info()
+            # Read the provider settings directly; building an agent would also create an API client
+            config_manager = ConfigurationManager()
+            config_manager.load_config(self.config_path)
+            provider_config = config_manager.get_provider_config()
+            provider_type = provider_config.provider_type
+            ProviderClientFactory.validate_provider_config(provider_type, provider_config.additional_params)
+            
+            provider_info = ProviderClientFactory.get_provider_info(provider_type)
+            model_info = ProviderClientFactory.get_model_info(provider_type, provider_config.model)
+            return {
+                "provider_type": provider_type,
+                "provider_name": provider_info.get('name', provider_type),
+                "model": provider_config.model,
+                "model_name": model_info.get('name', provider_config.model),
+                "base_url": provider_config.base_url,
+                "supports_function_calling": model_info.get('supports_function_calling', True),
+                "context_window": model_info.get('context_window', 'Unknown')
+            }
         except Exception as e:
             return {
                 "provider_type": "unknown",
@@ -147,8 +223,12 @@ class AgentManager:
         try:
             self.is_running = True
             
-            # Create agent
-            agent = UniversalAgent(config_path=self.config_path, silent=True)
+            # Reuse the agent (its client and tools) while the config file is unchanged
+            config_stat = self._read_config_stat()
+            if self._single_agent is None or self._single_agent_stat != config_stat:
+                self._single_agent = UniversalAgent(config_path=self.config_path, silent=True)
+                self._single_agent_stat = config_stat
+            agent = self._single_agent
             
             # Run agent
             response = agent.run(message)
@@ -158,7 +238,7 @@ class AgentManager:
             
         except Exception as e:
             self.is_running = False
-            raise Exception(f"Single agent execution failed: {str(e)}")
+            raise AgentExecutionError(f"Single agent execution failed: {e}") from e
     
     def run_heavy_mode(self, message: str) -> str:
         """Run heavy mode with progress tracking"""
@@ -167,18 +247,19 @@ class AgentManager:
             
             # Create orchestrator
             self.orchestrator = TaskOrchestrator(config_path=self.config_path, silent=True)
+            self.orchestrator.add_progress_listener(lambda agent_id, status: self._progress_changed.set())
             
             # Initialize progress tracking
-            self.agent_progress = {}
-            for i in range(self.orchestrator.num_agents):
-                self.agent_progress[i] = AgentProgress(
-                    agent_id=i,
-                    status="QUEUED",
-                    progress_bar=self._create_progress_bar("QUEUED")
-                )
+            queued_bar = self._create_progress_bar("QUEUED")
+            self.agent_progress = {
+                i: AgentProgress(agent_id=i, status="QUEUED", progress_bar=queued_bar)
+                for i in range(self.orchestrator.num_agents)
+            }
+            self._progress_view = types.MappingProxyType(self.agent_progress)
             
-            # Start progress monitoring
+            # Start progress monitoring; the first pass reports the queued agents
             if self.progress_callback:
+                self._progress_changed.set()
                 self.progress_monitor_thread = threading.Thread(
                     target=self._monitor_heavy_mode_progress,
                     daemon=True
@@ -189,48 +270,65 @@ class AgentManager:
             result = self.orchestrator.orchestrate(message)
             
             # Update final progress
-            for i in range(self.orchestrator.num_agents):
-                if self.agent_progress[i].status != "FAILED":
-                    self.agent_progress[i].status = "COMPLETED"
-                    self.agent_progress[i].progress_bar = self._create_progress_bar("COMPLETED")
+            completed_bar = self._create_progress_bar("COMPLETED")
+            for agent_progress in self.agent_progress.values():
+                if agent_progress.status != "FAILED":
+                    agent_progress.status = "COMPLETED"
+                    agent_progress.progress_bar = completed_bar
             
             # Final progress update
             if self.progress_callback:
-                self.progress_callback(self.agent_progress.copy())
+                self.progress_callback(self._progress_view)
             
             self.is_running = False
+            self._progress_changed.set()  # Let the monitor thread exit
             return result
             
         except Exception as e:
             self.is_running = False
+            self._progress_changed.set()  # Let the monitor thread exit
             # Update all agents to failed status
-            for i in range(len(self.agent_progress)):
-                self.agent_progress[i].status = f"FAILED: {str(e)}"
-                self.agent_progress[i].progress_bar = self._create_progress_bar(f"FAILED: {str(e)}")
+            failed_status = f"FAILED: {str(e)}"
+            failed_bar = self._create_progress_bar(failed_status)
+            for agent_progress in self.agent_progress.values():
+                agent_progress.status = failed_status
+                agent_progress.progress_bar = failed_bar
             
             if self.progress_callback:
-                self.progress_callback(self.agent_progress.copy())
+                self.progress_callback(self._progress_view)
             
-            raise Exception(f"Heavy mode execution failed: {str(e)}")
+            raise AgentExecutionError(f"Heavy mode execution failed: {e}") from e
     
     def _monitor_heavy_mode_progress(self):
         """Monitor progress for heavy mode execution"""
-        while self.is_running and self.orchestrator:
+        first_pass = True
+        while True:
+            # Sleep until an agent's status changes; the timeout is only a safety net.
+            # Changes made while the callback runs set the event again, so they are
+            # coalesced into one pass with the latest statuses rather than queued.
+            self._progress_changed.wait(timeout=5.0)
+            self._progress_changed.clear()
+            if not (self.is_running and self.orchestrator):
+                break
+            
             try:
                 # Get progress from orchestrator
                 orchestrator_progress = self.orchestrator.get_progress_status()
                 
-                # Update our progress tracking
+                # Update only the agents whose status changed
+                # The first pass always reports so the GUI shows the queued agents
+                changed, first_pass = first_pass, False
                 for agent_id, status in orchestrator_progress.items():
-                    if agent_id in self.agent_progress:
-                        self.agent_progress[agent_id].status = status
-                        self.agent_progress[agent_id].progress_bar = self._create_progress_bar(status)
+                    agent_progress = self.agent_progress.get(agent_id)
+                    if agent_progress is None or agent_progress.status == status:
+                        continue
+                    agent_progress.status = status
+                    agent_progress.progress_bar = self._create_progress_bar(status)
+                    changed = True
                 
                 # Call progress callback
-                if self.progress_callback:
-                    self.progress_callback(self.agent_progress.copy())
-                
-                time.sleep(1.0)  # Update every second
+                if changed and self.progress_callback:
+                    self.progress_callback(self._progress_view)
                 
             except Exception as e:
                 print(f"Progress monitoring error: {e}")
@@ -238,43 +336,31 @@ class AgentManager:
     
     def _create_progress_bar(self, status: str) -> str:
         """Create progress bar visualization based on status"""
-        if status == "QUEUED":
-            return "○ " + "·" * 70
-        elif status == "INITIALIZING...":
-            return "◐ " + "·" * 70
-        elif status == "PROCESSING...":
-            # Animated processing bar
-            dots = ":" * 10 + "·" * 60
-            return "● " + dots
-        elif status == "COMPLETED":
-            return "● " + ":" * 70
-        elif status.startswith("FAILED"):
-            return "✗ " + "×" * 70
-        else:
-            return "◐ " + "·" * 70
+        return progress_bar_for(status)
+    
+    def _run_in_background(self, message: str, completion_callback: Optional[Callable[[str], None]]):
+        """Run the current mode and report the result (or error) to the completion callback"""
+        try:
+            if self.current_mode == "single":
+                result = self.run_single_agent(message)
+            else:
+                result = self.run_heavy_mode(message)
+            
+            # Call completion callback (only once)
+            callback_to_use = completion_callback or self.completion_callback
+            if callback_to_use:
+                callback_to_use(result)
+                
+        except Exception as e:
+            error_msg = f"Error: {str(e)}"
+            callback_to_use = completion_callback or self.completion_callback
+            if callback_to_use:
+                callback_to_use(error_msg)
     
     def run_async(self, message: str, completion_callback: Optional[Callable[[str], None]] = None):
         """Run agent asynchronously in background thread"""
-        def run_in_background():
-            try:
-                if self.current_mode == "single":
-                    result = self.run_single_agent(message)
-                else:
-                    result = self.run_heavy_mode(message)
-                
-                # Call completion callback (only once)
-                callback_to_use = completion_callback or self.completion_callback
-                if callback_to_use:
-                    callback_to_use(result)
-                    
-            except Exception as e:
-                error_msg = f"Error: {str(e)}"
-                callback_to_use = completion_callback or self.completion_callback
-                if callback_to_use:
-                    callback_to_use(error_msg)
-        
         # Start background thread
-        thread = threading.Thread(target=run_in_background, daemon=True)
+        thread = threading.Thread(target=self._run_in_background, args=(message, completion_callback), daemon=True)
         thread.start()
         return thread
     
@@ -285,6 +371,7 @@ class AgentManager:
     def stop_execution(self):
         """Stop current execution (if possible)"""
         self.is_running = False
+        self._progress_changed.set()  # Wake the progress monitor so it exits now
         # Note: This is a soft stop - actual agent execution may continue
         # until it reaches a natural stopping point
     
@@ -299,9 +386,8 @@ class AgentManager:
         else:
             try:
                 if not self.orchestrator:
-                    # Load config to get agent count
-                    with open(self.config_path, 'r') as f:
-                        config = yaml.safe_load(f)
+                    # Load config to get agent count; unchanged files are not re-parsed
+                    config = ConfigurationManager().load_config(self.config_path)
                     return config.get('orchestrator', {}).get('parallel_agents', 4)
                 return self.orchestrator.num_agents
             except:
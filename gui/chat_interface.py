@@ -1,18 +1,59 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
+import functools
+from collections import deque
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 import sys
 import os
 
 # Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
-from gui.agent_manager import AgentManager, AgentProgress
+from gui.agent_manager import AgentManager, AgentProgress, progress_bar_for
 from gui.session_manager import SessionManager
 from gui.theme_manager import ThemeManager
 
 
+# Only the most recent messages are kept in the chat display; older session
+# messages are rendered again a page at a time when scrolled back to
+_MAX_RENDERED_MESSAGES = 200
+_HISTORY_PAGE_SIZE = 50
+
+# Heavy mode progress lines shown before any agent reports, for up to 8 agents
+_QUEUED_PROGRESS_BAR = progress_bar_for("QUEUED")
+_QUEUED_PROGRESS_LINES = tuple(f"AGENT {i+1:02d}  {_QUEUED_PROGRESS_BAR}\n" for i in range(8))
+
+
+@functools.lru_cache(maxsize=1440)
+def _timestamp_line(hour: int, minute: int) -> str:
+    """Timestamp line shown above a message; there are only 1440 distinct ones"""
+    return f"{hour:02d}:{minute:02d}\n"
+
+
+# Platform fonts for the chat widgets and default message tags
+if sys.platform == 'darwin':
+    _FONT_BODY = ('SF Pro Display', 12)
+    _FONT_MESSAGE = ('SF Pro Display', 12, 'normal')
+    _FONT_SYSTEM = ('SF Pro Display', 11, 'italic')
+    _FONT_TIMESTAMP = ('SF Pro Display', 9)
+    _FONT_HEADER = ('SF Pro Display', 12, 'bold')
+    _FONT_PROGRESS = ('Courier New', 10)
+    _FONT_PROCESSING = ('SF Pro Display', 11, 'italic')
+    _FONT_BUTTON = ('SF Pro Display', 11, 'bold')
+else:
+    _FONT_BODY = ('Segoe UI', 10)
+    _FONT_MESSAGE = ('Segoe UI', 10, 'normal')
+    _FONT_SYSTEM = ('Segoe UI', 9, 'italic')
+    _FONT_TIMESTAMP = ('Segoe UI', 8)
+    _FONT_HEADER = ('Segoe UI', 11, 'bold')
+    _FONT_PROGRESS = ('Consolas', 9)
+    _FONT_PROCESSING = ('Segoe UI', 10, 'italic')
+    _FONT_BUTTON = ('Segoe UI', 9, 'bold')
+
+
 class ChatInterface:
     def __init__(self, parent, agent_manager: Optional[AgentManager] = None, 
                  session_manager: Optional[SessionManager] = None,
@@ -24,6 +65,12 @@ class ChatInterface:
         self.current_mode = "single"
         self.is_processing = False
         self.progress_widgets = {}  # Store progress widgets for Heavy Mode
+        self._last_progress: Dict[int, str] = {}  # Progress line currently shown per agent
+        # (line count, from session) for each message in the chat display, oldest first
+        self._rendered_messages = deque()
+        # Index of the oldest session message in the chat display
+        self._history_start = 0
+        self._history_pending = False
         self.setup_ui()
         
     def setup_ui(self):
@@ -52,7 +99,7 @@ class ChatInterface:
             display_frame,
             wrap=tk.WORD,
             state=tk.DISABLED,
-            font=('SF Pro Display', 12) if sys.platform == 'darwin' else ('Segoe UI', 10),
+            font=_FONT_BODY,
             relief='flat',
             borderwidth=0,
             padx=15,
@@ -60,6 +107,7 @@ class ChatInterface:
             highlightthickness=1
         )
         self.chat_display.pack(fill=tk.BOTH, expand=True)
+        self.chat_display.configure(yscrollcommand=self._on_chat_scroll)
         
         # Apply theme to chat display
         if self.theme_manager:
@@ -102,7 +150,7 @@ class ChatInterface:
             "user_message",
             background="#007bff",
             foreground="white",
-            font=('SF Pro Display', 12, 'normal') if sys.platform == 'darwin' else ('Segoe UI', 10, 'normal'),
+            font=_FONT_MESSAGE,
             spacing1=8,
             spacing3=8,
             lmargin1=80,
@@ -118,7 +166,7 @@ class ChatInterface:
             "agent_message",
             background="#f8f9fa",
             foreground="#333333",
-            font=('SF Pro Display', 12, 'normal') if sys.platform == 'darwin' else ('Segoe UI', 10, 'normal'),
+            font=_FONT_MESSAGE,
             spacing1=8,
             spacing3=8,
             lmargin1=20,
@@ -134,7 +182,7 @@ class ChatInterface:
             "system_message",
             background="#e9ecef",
             foreground="#6c757d",
-            font=('SF Pro Display', 11, 'italic') if sys.platform == 'darwin' else ('Segoe UI', 9, 'italic'),
+            font=_FONT_SYSTEM,
             spacing1=5,
             spacing3=5,
             justify=tk.CENTER,
@@ -145,7 +193,7 @@ class ChatInterface:
         self.chat_display.tag_configure(
             "timestamp",
             foreground="#6c757d",
-            font=('SF Pro Display', 9) if sys.platform == 'darwin' else ('Segoe UI', 8),
+            font=_FONT_TIMESTAMP,
             spacing3=2
         )
         
@@ -153,7 +201,7 @@ class ChatInterface:
         self.chat_display.tag_configure(
             "heavy_mode_header",
             foreground="#333333",
-            font=('SF Pro Display', 12, 'bold') if sys.platform == 'darwin' else ('Segoe UI', 11, 'bold'),
+            font=_FONT_HEADER,
             spacing1=10,
             spacing3=5,
             justify=tk.CENTER
@@ -162,7 +210,7 @@ class ChatInterface:
         self.chat_display.tag_configure(
             "agent_progress",
             foreground="#666666",
-            font=('Courier New', 10) if sys.platform == 'darwin' else ('Consolas', 9),
+            font=_FONT_PROGRESS,
             spacing1=2,
             spacing3=2,
             wrap=tk.NONE
@@ -172,7 +220,7 @@ class ChatInterface:
         self.chat_display.tag_configure(
             "processing",
             foreground="#007bff",
-            font=('SF Pro Display', 11, 'italic') if sys.platform == 'darwin' else ('Segoe UI', 10, 'italic'),
+            font=_FONT_PROCESSING,
             spacing1=5,
             spacing3=5,
             justify=tk.CENTER
@@ -189,7 +237,7 @@ class ChatInterface:
             input_frame,
             height=3,
             wrap=tk.WORD,
-            font=('SF Pro Display', 12) if sys.platform == 'darwin' else ('Segoe UI', 10),
+            font=_FONT_BODY,
             relief='flat',
             borderwidth=0,
             padx=10,
@@ -222,7 +270,7 @@ class ChatInterface:
         
         # Configure button style
         style = ttk.Style()
-        style.configure('Accent.TButton', font=('SF Pro Display', 11, 'bold') if sys.platform == 'darwin' else ('Segoe UI', 9, 'bold'))
+        style.configure('Accent.TButton', font=_FONT_BUTTON)
         
         # Bind keyboard events
         self.message_input.bind('<Return>', self.on_enter_key)
@@ -295,16 +343,15 @@ class ChatInterface:
             timestamp = datetime.now()
         
         # Save to session if enabled
-        if save_to_session and self.session_manager:
+        saved = save_to_session and self.session_manager is not None
+        if saved:
             self.session_manager.add_message(sender, message, message_type)
-            
-        # Enable text widget for editing
-        self.chat_display.config(state=tk.NORMAL)
-        
-        # Add timestamp
-        time_str = timestamp.strftime("%H:%M")
-        self.chat_display.insert(tk.END, f"{time_str}\n", "timestamp")
         
+        self._render_message(sender, message, timestamp, message_type, from_session=saved)
+    
+    def _format_message(self, sender: str, message: str, timestamp: datetime,
+                        message_type: str = "text") -> List[str]:
+        """Build the alternating text/tag arguments for inserting a message"""
         # Determine tag based on message type and sender
         if message_type == "error":
             tag = "error"
@@ -328,20 +375,86 @@ class ChatInterface:
             tag = "system_message"
             display_message = f"{message}\n\n"
         
-        # Add message with appropriate tag
-        self.chat_display.insert(tk.END, display_message, tag)
-            
+        return [_timestamp_line(timestamp.hour, timestamp.minute), "timestamp", display_message, tag]
+    
+    def _format_session_messages(self, messages) -> Tuple[List[str], List[int]]:
+        """Build insert arguments for saved messages, plus the line count of each one"""
+        segments = []
+        line_counts = []
+        for message in messages:
+            message_segments = self._format_message(message.sender, message.content, message.timestamp)
+            segments.extend(message_segments)
+            line_counts.append(message_segments[0].count("\n") + message_segments[2].count("\n"))
+        return segments, line_counts
+    
+    def _render_message(self, sender: str, message: str, timestamp: datetime,
+                        message_type: str = "text", from_session: bool = False):
+        """Append a message to the chat display and drop the oldest ones beyond the cap"""
+        segments = self._format_message(sender, message, timestamp, message_type)
+        
+        # Enable text widget for editing
+        self.chat_display.config(state=tk.NORMAL)
+        
+        # Add timestamp and message with their tags
+        self.chat_display.insert(tk.END, *segments)
+        self._rendered_messages.append((segments[0].count("\n") + segments[2].count("\n"), from_session))
+        self._trim_rendered_messages()
+        
         # Disable text widget to prevent editing
         self.chat_display.config(state=tk.DISABLED)
         
         # Auto-scroll to bottom
         self.chat_display.see(tk.END)
+    
+    def _trim_rendered_messages(self):
+        """Delete the oldest messages from the chat display once it holds more than the cap"""
+        # The progress display is located by line number, so leave the lines alone while it is shown
+        excess = len(self._rendered_messages) - _MAX_RENDERED_MESSAGES
+        if excess <= 0 or hasattr(self, 'progress_start_pos'):
+            return
+        
+        line_count = 0
+        for _ in range(excess):
+            lines, from_session = self._rendered_messages.popleft()
+            line_count += lines
+            if from_session:
+                self._history_start += 1
+        self.chat_display.delete("1.0", f"{line_count + 1}.0")
+    
+    def _on_chat_scroll(self, first, last):
+        """Update the scrollbar and schedule older messages when scrolled near the top"""
+        self.chat_display.vbar.set(first, last)
+        if float(first) < 0.05 and self._history_start > 0 and not self._history_pending:
+            self._history_pending = True
+            self.chat_display.after_idle(self._render_older_messages)
+    
+    def _render_older_messages(self):
+        """Insert the previous page of session messages above the ones shown"""
+        self._history_pending = False
+        current_session = self.session_manager.get_current_session() if self.session_manager else None
+        if not current_session or self._history_start <= 0 or hasattr(self, 'progress_start_pos'):
+            return
+        
+        start = max(0, self._history_start - _HISTORY_PAGE_SIZE)
+        segments, line_counts = self._format_session_messages(current_session.messages[start:self._history_start])
+        
+        # Keep the same line at the top of the view while the page is added above it
+        top_line = int(self.chat_display.index("@0,0").split('.')[0])
+        self.chat_display.config(state=tk.NORMAL)
+        self.chat_display.insert("1.0", *segments)
+        self.chat_display.config(state=tk.DISABLED)
+        self.chat_display.yview(f"{top_line + sum(line_counts)}.0")
+        
+        self._rendered_messages.extendleft((lines, True) for lines in reversed(line_counts))
+        self._history_start = start
         
     def clear_chat(self):
         """Clear the chat display"""
         self.chat_display.config(state=tk.NORMAL)
         self.chat_display.delete("1.0", tk.END)
         self.chat_display.config(state=tk.DISABLED)
+        self._rendered_messages.clear()
+        self._history_start = 0
         
         # Create new session if session manager is available
         if self.session_manager:
@@ -409,11 +522,14 @@ class ChatInterface:
         
         # Add initial progress lines for each agent
         agent_count = self.agent_manager.get_agent_count() if self.agent_manager else 4
-        for i in range(agent_count):
-            progress_line = f"AGENT {i+1:02d}  ○ " + "·" * 70 + "\n"
-            self.chat_display.insert(tk.END, progress_line, "agent_progress")
+        self._last_progress = {
+            i: _QUEUED_PROGRESS_LINES[i] if i < len(_QUEUED_PROGRESS_LINES)
+            else f"AGENT {i+1:02d}  {_QUEUED_PROGRESS_BAR}\n"
+            for i in range(agent_count)
+        }
         
-        self.chat_display.insert(tk.END, "\n", "agent_progress")
+        # All lines share one tag, so insert them (and the trailing blank line) at once
+        self.chat_display.insert(tk.END, "".join(self._last_progress.values()) + "\n", "agent_progress")
         
         # Disable text widget
         self.chat_display.config(state=tk.DISABLED)
@@ -426,30 +542,33 @@ class ChatInterface:
         if not hasattr(self, 'progress_start_pos'):
             return
         
-        # Enable text widget for editing
-        self.chat_display.config(state=tk.NORMAL)
-        
-        # Calculate the range to replace
         start_line = int(self.progress_start_pos.split('.')[0])
-        agent_count = len(progress)
-        end_pos = f"{start_line + agent_count}.0"
-        
-        # Clear existing progress lines
-        self.chat_display.delete(self.progress_start_pos, end_pos)
         
-        # Insert updated progress lines
-        self.chat_display.mark_set(tk.INSERT, self.progress_start_pos)
-        for i in range(agent_count):
-            if i in progress:
-                agent_progress = progress[i]
-                progress_line = f"AGENT {i+1:02d}  {agent_progress.progress_bar}\n"
-                self.chat_display.insert(tk.INSERT, progress_line, "agent_progress")
-        
-        # Disable text widget
-        self.chat_display.config(state=tk.DISABLED)
-        
-        # Auto-scroll to bottom
-        self.chat_display.see(tk.END)
+        # Replace only the lines of agents whose progress bar changed
+        changed = False
+        for i in range(len(progress)):
+            agent_progress = progress.get(i)
+            if agent_progress is None:
+                continue
+            progress_line = f"AGENT {i+1:02d}  {agent_progress.progress_bar}\n"
+            if self._last_progress.get(i) == progress_line:
+                continue
+            
+            if not changed:
+                # Enable text widget for editing
+                self.chat_display.config(state=tk.NORMAL)
+                changed = True
+            line_start = f"{start_line + i}.0"
+            self.chat_display.delete(line_start, f"{start_line + i + 1}.0")
+            self.chat_display.insert(line_start, progress_line, "agent_progress")
+            self._last_progress[i] = progress_line
+        
+        if changed:
+            # Disable text widget
+            self.chat_display.config(state=tk.DISABLED)
+            
+            # Auto-scroll to bottom
+            self.chat_display.see(tk.END)
     
     def clear_progress_display(self):
         """Clear the Heavy Mode progress display"""
@@ -470,6 +589,7 @@ class ChatInterface:
             
             # Remove progress start position
             delattr(self, 'progress_start_pos')
+            self._last_progress = {}
     
     def load_session(self):
         """Load current session messages into chat display"""
@@ -477,18 +597,22 @@ class ChatInterface:
         self.chat_display.config(state=tk.NORMAL)
         self.chat_display.delete("1.0", tk.END)
         self.chat_display.config(state=tk.DISABLED)
+        self._rendered_messages.clear()
+        self._history_start = 0
         
         if self.session_manager:
             current_session = self.session_manager.get_current_session()
             if current_session and current_session.messages:
-                # Load messages from session
-                for message in current_session.messages:
-                    self.add_message(
-                        message.sender, 
-                        message.content, 
-                        message.timestamp,
-                        save_to_session=False  # Don't save when loading
-                    )
+                # Load the most recent messages; older ones are rendered when scrolled back to
+                self._history_start = max(0, len(current_session.messages) - _MAX_RENDERED_MESSAGES)
+                segments, line_counts = self._format_session_messages(current_session.messages[self._history_start:])
+                
+                # Insert them all with one widget call and scroll once
+                self.chat_display.config(state=tk.NORMAL)
+                self.chat_display.insert(tk.END, *segments)
+                self.chat_display.config(state=tk.DISABLED)
+                self.chat_display.see(tk.END)
+                self._rendered_messages.extend((lines, True) for lines in line_counts)
             else:
                 # Add welcome message for new session
                 self.add_message("system", "Welcome to Make It Heavy! Type your message below to get started.", save_to_session=False)
@@ -4,13 +4,15 @@ import sys
 import os
 
 # Add the parent directory to the path to import project modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
 from gui.chat_interface import ChatInterface
 from gui.settings_panel import SettingsPanel, AppConfig
-from gui.agent_manager import AgentManager
+from gui.agent_manager import AgentManager, ConfigUpdateError
 from gui.session_manager import SessionManager
-from gui.theme_manager import ThemeManager
+from gui.theme_manager import ThemeManager, use_preferred_ttk_theme
 from gui.multi_model_config_panel import MultiModelConfigPanel
 
 
@@ -47,11 +49,7 @@ class MainApplication:
         self.style = ttk.Style()
         
         # Try to use a more modern theme if available
-        available_themes = self.style.theme_names()
-        if 'aqua' in available_themes:  # macOS native theme
-            self.style.theme_use('aqua')
-        elif 'clam' in available_themes:  # Modern alternative
-            self.style.theme_use('clam')
+        use_preferred_ttk_theme(self.style)
         
         # Apply theme styles
         self.theme_manager.configure_ttk_styles(self.style)
@@ -212,8 +210,8 @@ class MainApplication:
                     print(f"Configuration updated: Provider={config.provider}, Model={config.model}")
                 else:
                     print(f"Warning: No API key found for provider {config.provider}")
-            except Exception as e:
-                print(f"Failed to update agent configuration: {e}")
+            except ConfigUpdateError as e:
+                print(f"Failed to update agent configuration: {e.__cause__}")
         
         # Update mode selection if different
         if config.mode != self.mode_var.get():
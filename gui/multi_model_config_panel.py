@@ -13,7 +13,9 @@ from dataclasses import dataclass
 import threading
 
 # Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
 from model_config.model_configuration_manager import ModelConfigurationManager, ModelConfigurationManagerError
 from model_config.data_models import ModelInfo, AgentModelConfig, CostEstimate, ConfigurationProfile
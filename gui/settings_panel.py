@@ -12,7 +12,9 @@ from typing import Dict, List, Optional, Callable
 from dataclasses import dataclass
 
 # Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
 from config_manager import ConfigurationManager, ConfigurationError, ProviderConfig
 from provider_factory import ProviderClientFactory, ProviderError
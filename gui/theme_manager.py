@@ -12,6 +12,31 @@ from typing import Dict, Any, Optional, Callable
 from dataclasses import dataclass
 
 
+# ttk theme picked by use_preferred_ttk_theme; probed once per process
+_UNSET = object()
+_preferred_ttk_theme = _UNSET
+
+
+def use_preferred_ttk_theme(style: ttk.Style) -> Optional[str]:
+    """Switch to the native macOS theme, or clam, when available.
+    
+    The available themes are only probed the first time; later windows reuse the choice.
+    """
+    global _preferred_ttk_theme
+    if _preferred_ttk_theme is _UNSET:
+        available_themes = style.theme_names()
+        if 'aqua' in available_themes:  # macOS native theme
+            _preferred_ttk_theme = 'aqua'
+        elif 'clam' in available_themes:  # Modern alternative
+            _preferred_ttk_theme = 'clam'
+        else:
+            _preferred_ttk_theme = None
+    
+    if _preferred_ttk_theme is not None:
+        style.theme_use(_preferred_ttk_theme)
+    return _preferred_ttk_theme
+
+
 @dataclass
 class ThemeColors:
     """Theme color definitions"""
@@ -57,6 +82,8 @@ class ThemeManager:
     def __init__(self):
         self.current_theme = "light"
         self.theme_change_callbacks: List[Callable[[str], None]] = []
+        # Chat message tag configs per theme name, built on first use
+        self._message_tag_configs: Dict[str, Dict[str, Dict[str, Any]]] = {}
         
         # Define theme colors
         self.themes = {
@@ -313,9 +340,18 @@ class ThemeManager:
             print(f"Error configuring ttk styles: {e}")
     
     def get_message_tag_config(self, message_type: str) -> Dict[str, Any]:
-        """Get text tag configuration for chat messages"""
-        colors = self.get_theme_colors()
+        """Get text tag configuration for chat messages.
         
+        The configs for a theme are built once and shared; callers must not modify them.
+        """
+        configs = self._message_tag_configs.get(self.current_theme)
+        if configs is None:
+            configs = self._build_message_tag_configs(self.get_theme_colors())
+            self._message_tag_configs[self.current_theme] = configs
+        return configs.get(message_type, {})
+    
+    def _build_message_tag_configs(self, colors: ThemeColors) -> Dict[str, Dict[str, Any]]:
+        """Build the text tag configuration for every chat message type"""
         base_font = ('SF Pro Display', 12) if sys.platform == 'darwin' else ('Segoe UI', 10)
         small_font = ('SF Pro Display', 9) if sys.platform == 'darwin' else ('Segoe UI', 8)
         mono_font = ('Courier New', 10) if sys.platform == 'darwin' else ('Consolas', 9)
@@ -404,7 +440,7 @@ class ThemeManager:
             }
         }
         
-        return configs.get(message_type, {})
+        return configs
     
     def start_theme_monitoring(self, check_interval: int = 5000):
         """Start monitoring system theme changes (macOS only)"""
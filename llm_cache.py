@@ -0,0 +1,205 @@
+"""
+Exact-match response cache for deterministic LLM calls.
+Keys are derived from (model, messages, tools); values are serialized responses.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol, Tuple
+from config_manager import ConfigurationError
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "make-it-heavy")
+
+
+class CacheBackend(Protocol):
+    """Storage interface used by LLMCache"""
+
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    def set(self, key: str, value: str) -> None:
+        ...
+
+
+class MemoryLRUCache:
+    """In-process LRU cache backed by an OrderedDict, with optional per-entry TTL"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class DiskCache:
+    """Persistent cache shared across processes (requires the diskcache package)"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        try:
+            import diskcache
+        except ImportError:
+            raise ImportError("The disk cache backend requires 'diskcache' (pip install diskcache)")
+        self._cache = diskcache.Cache(directory)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self._cache.set(key, value)
+
+
+class CachedObject(dict):
+    """Dict with attribute access.
+
+    Cached responses are rebuilt from these so they can be read like SDK
+    objects (response.choices[0].message) while tool calls stored back in
+    the conversation still serialize as plain JSON on the next request.
+    """
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def _json_default(obj: Any) -> Any:
+    """Fallback encoder for SDK objects that end up in the message history"""
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump()
+    if hasattr(obj, '__dict__'):
+        return vars(obj)
+    return str(obj)
+
+
+def make_cache_key(model: str, messages: Any, tools: Any) -> str:
+    """Hash the request inputs that determine a deterministic response"""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "tools": tools},
+        sort_keys=True,
+        default=_json_default
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def serialize_response(response: Any) -> str:
+    """Keep only the parts of a chat completion the agent loop reads"""
+    message = response.choices[0].message
+    tool_calls = None
+    if message.tool_calls:
+        tool_calls = [
+            {
+                "id": tool_call.id,
+                "type": "function",
+                "function": {
+                    "name": tool_call.function.name,
+                    "arguments": tool_call.function.arguments
+                }
+            }
+            for tool_call in message.tool_calls
+        ]
+    return json.dumps({
+        "choices": [
+            {
+                "message": {
+                    "role": "assistant",
+                    "content": message.content,
+                    "tool_calls": tool_calls
+                }
+            }
+        ]
+    })
+
+
+def build_response(content: Optional[str], tool_calls: Optional[list] = None) -> CachedObject:
+    """Build a minimal chat completion (choices[0].message) from plain values"""
+    return deserialize_response(json.dumps({
+        "choices": [
+            {
+                "message": {
+                    "role": "assistant",
+                    "content": content,
+                    "tool_calls": tool_calls or None
+                }
+            }
+        ]
+    }))
+
+
+def deserialize_response(data: str) -> CachedObject:
+    """Rebuild a minimal response object from serialize_response output"""
+    return json.loads(data, object_hook=CachedObject)
+
+
+class LLMCache:
+    """Exact-match LLM response cache with hit/miss counters"""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedObject]:
+        data = self.backend.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return deserialize_response(data)
+
+    def set(self, key: str, response: Any) -> None:
+        self.backend.set(key, serialize_response(response))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters so the call reduction can be measured"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+def create_llm_cache(cache_config: Dict[str, Any]) -> Optional[LLMCache]:
+    """Build an LLMCache from the agent 'cache' config section (None when disabled)"""
+    if not cache_config or not cache_config.get('enabled', False):
+        return None
+
+    backend_type = cache_config.get('backend', 'memory')
+    if backend_type == 'memory':
+        backend = MemoryLRUCache(maxsize=cache_config.get('maxsize', 1024))
+    elif backend_type == 'disk':
+        backend = DiskCache(directory=cache_config.get('directory', DEFAULT_CACHE_DIR))
+    else:
+        raise ConfigurationError(f"Unknown LLM cache backend: {backend_type}")
+
+    return LLMCache(backend)
@@ -5,9 +5,10 @@ Data models for the multi-model configuration system.
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 from datetime import datetime
+from config_manager import DATACLASS_SLOTS
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ModelInfo:
     """Information about a specific model from a provider."""
     id: str
@@ -47,7 +48,7 @@ class CostInfo:
         return self.input_cost_per_1m is not None and self.output_cost_per_1m is not None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class AgentModelConfig:
     """Configuration mapping agents to specific models."""
     agent_0_model: str  # Research agent
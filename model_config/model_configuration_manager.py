@@ -393,9 +393,10 @@ class ModelConfigurationManager:
                     
             finally:
                 # Clean up temp file
-                import os
-                if os.path.exists(temp_config_path):
+                try:
                     os.unlink(temp_config_path)
+                except FileNotFoundError:
+                    pass
                     
         except Exception as e:
             return ModelTestResult(
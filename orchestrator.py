@@ -1,32 +1,36 @@
+import copy
 import json
-import yaml
 import time
+import asyncio
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from agent import UniversalAgent
 from config_manager import ConfigurationManager
 from model_config.data_models import AgentModelConfig
 from model_config.model_configuration_manager import ModelConfigurationManager
 from cost_monitor import CostMonitor, CostAlert
 
+# Removed from helper agents so they cannot end the task early
+_COMPLETION_TOOLS = frozenset({"mark_task_complete"})
+
 class TaskOrchestrator:
     def __init__(self, config_path="config.yaml", silent=False):
         # Store config path for agent creation
         self.config_path = config_path
         
-        # Load configuration
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        # Load configuration once; the orchestrator and its manager each get their own copy
+        self.config_manager = ConfigurationManager()
+        self.config = copy.deepcopy(self.config_manager.load_config(config_path))
         
         self.num_agents = self.config['orchestrator']['parallel_agents']
         self.task_timeout = self.config['orchestrator']['task_timeout']
         self.aggregation_strategy = self.config['orchestrator']['aggregation_strategy']
+        # Fan agents out on one asyncio event loop instead of a thread pool
+        self.async_agents = self.config['orchestrator'].get('async_agents', False)
         self.silent = silent
         
         # Initialize configuration managers
-        self.config_manager = ConfigurationManager()
-        self.config_manager.load_config(config_path)
         self.model_config_manager = ModelConfigurationManager(self.config_manager)
         
         # Load multi-model configuration if available
@@ -38,6 +42,7 @@ class TaskOrchestrator:
         self.agent_models = {}  # Track which model each agent uses
         self.agent_costs = {}   # Track costs per agent
         self.progress_lock = threading.Lock()
+        self.progress_listeners: List[Callable[[int, str], None]] = []
         
         # Cost monitoring
         self.cost_monitor: Optional[CostMonitor] = None
@@ -53,7 +58,8 @@ class TaskOrchestrator:
         self.budget_limit = budget_limit
         self.cost_monitor = CostMonitor(
             budget_limit=budget_limit,
-            alert_callback=self._handle_cost_alert
+            alert_callback=self._handle_cost_alert,
+            silent=self.silent
         )
         
         if not self.silent:
@@ -77,9 +83,13 @@ class TaskOrchestrator:
         return None
     
     def _load_multi_model_config(self) -> Optional[AgentModelConfig]:
-        """Load multi-model configuration from YAML file."""
+        """Load multi-model configuration from the already parsed config."""
+        multi_model_config = self.config.get('multi_model')
+        if not multi_model_config:
+            return None
+        
         try:
-            return self.model_config_manager.load_agent_configuration(self.config_path)
+            return AgentModelConfig.from_dict(multi_model_config)
         except Exception as e:
             if not self.silent:
                 print(f"⚠️  No multi-model configuration found, using default model: {e}")
@@ -168,8 +178,7 @@ class TaskOrchestrator:
         )
         
         # Remove task completion tool to avoid issues
-        question_agent.tools = [tool for tool in question_agent.tools if tool.get('function', {}).get('name') != 'mark_task_complete']
-        question_agent.tool_mapping = {name: func for name, func in question_agent.tool_mapping.items() if name != 'mark_task_complete'}
+        question_agent.remove_tools(_COMPLETION_TOOLS)
         
         # Note: If tools array becomes empty, the updated call_llm method will handle it properly
         
@@ -195,12 +204,82 @@ class TaskOrchestrator:
                 f"Verify and cross-check facts about: {user_input}"
             ][:num_agents]
     
+    def add_progress_listener(self, listener: Callable[[int, str], None]):
+        """Register a callback that receives (agent_id, status) on every progress update"""
+        self.progress_listeners.append(listener)
+    
     def update_agent_progress(self, agent_id: int, status: str, result: str = None):
         """Thread-safe progress tracking"""
         with self.progress_lock:
             self.agent_progress[agent_id] = status
             if result is not None:
                 self.agent_results[agent_id] = result
+        
+        for listener in self.progress_listeners:
+            try:
+                listener(agent_id, status)
+            except Exception as e:
+                if not self.silent:
+                    print(f"Progress listener failed: {e}")
+    
+    def _start_agent(self, agent_id: int, subtask: str) -> str:
+        """Mark an agent as processing and return the model it should use"""
+        if not self.silent:
+            print(f"🔄 Agent {agent_id} starting task: {subtask[:50]}...")
+        
+        self.update_agent_progress(agent_id, "PROCESSING...")
+        
+        # Get the model for this agent
+        return self._get_agent_model(agent_id)
+    
+    def _build_agent(self, agent_id: int, agent_model: str) -> UniversalAgent:
+        """Create an agent with its specific model"""
+        agent = self._create_agent_with_model(agent_id, agent_model)
+        
+        if not self.silent:
+            print(f"⚡ Agent {agent_id} running with model {agent_model}...")
+        
+        return agent
+    
+    def _agent_success(self, agent_id: int, subtask: str, agent_model: str,
+                       response: str, execution_time: float) -> Dict[str, Any]:
+        """Record a finished agent and build its result dictionary"""
+        if not self.silent:
+            print(f"✅ Agent {agent_id} completed in {execution_time:.2f}s")
+        
+        self.update_agent_progress(agent_id, "COMPLETED", response)
+        
+        # Calculate estimated cost (simplified - in real implementation would track actual tokens)
+        estimated_cost = self._estimate_agent_cost(agent_id, agent_model, len(subtask), len(response))
+        
+        return {
+            "agent_id": agent_id,
+            "status": "success", 
+            "response": response,
+            "execution_time": execution_time,
+            "model": agent_model,
+            "estimated_cost": estimated_cost
+        }
+    
+    def _agent_error(self, agent_id: int, agent_model: Optional[str], e: Exception) -> Dict[str, Any]:
+        """Build the result dictionary for an agent that raised"""
+        # Enhanced error handling with model-specific information
+        error_msg = f"Agent {agent_id} error"
+        if agent_model:
+            error_msg += f" (model: {agent_model})"
+        error_msg += f": {str(e)}"
+        
+        if not self.silent:
+            print(f"🚨 {error_msg}")
+        
+        return {
+            "agent_id": agent_id,
+            "status": "error",
+            "response": error_msg,
+            "execution_time": 0,
+            "model": agent_model or "unknown",
+            "estimated_cost": 0.0
+        }
     
     def run_agent_parallel(self, agent_id: int, subtask: str) -> Dict[str, Any]:
         """
@@ -209,59 +288,69 @@ class TaskOrchestrator:
         """
         agent_model = None
         try:
-            if not self.silent:
-                print(f"🔄 Agent {agent_id} starting task: {subtask[:50]}...")
-            
-            self.update_agent_progress(agent_id, "PROCESSING...")
-            
-            # Get the model for this agent
-            agent_model = self._get_agent_model(agent_id)
-            
-            # Create agent with specific model
-            agent = self._create_agent_with_model(agent_id, agent_model)
-            
-            if not self.silent:
-                print(f"⚡ Agent {agent_id} running with model {agent_model}...")
+            agent_model = self._start_agent(agent_id, subtask)
+            agent = self._build_agent(agent_id, agent_model)
             
             start_time = time.time()
             response = agent.run(subtask)
             execution_time = time.time() - start_time
             
-            if not self.silent:
-                print(f"✅ Agent {agent_id} completed in {execution_time:.2f}s")
+            return self._agent_success(agent_id, subtask, agent_model, response, execution_time)
             
-            self.update_agent_progress(agent_id, "COMPLETED", response)
+        except Exception as e:
+            return self._agent_error(agent_id, agent_model, e)
+    
+    async def arun_agent_parallel(self, agent_id: int, subtask: str,
+                                  llm_semaphore: Optional[asyncio.Semaphore] = None) -> Dict[str, Any]:
+        """
+        Async variant of run_agent_parallel.
+        Awaits agent.arun so all agents share a single event loop.
+        If llm_semaphore is given, the agent's LLM calls are bounded by it.
+        """
+        agent_model = None
+        try:
+            agent_model = self._start_agent(agent_id, subtask)
+            # Tool discovery and client setup block, so keep them off the event loop
+            agent = await asyncio.to_thread(self._build_agent, agent_id, agent_model)
+            if llm_semaphore is not None:
+                agent.llm_semaphore = llm_semaphore
             
-            # Calculate estimated cost (simplified - in real implementation would track actual tokens)
-            estimated_cost = self._estimate_agent_cost(agent_id, agent_model, len(subtask), len(response))
+            try:
+                start_time = time.time()
+                response = await agent.arun(subtask)
+                execution_time = time.time() - start_time
+            finally:
+                await agent.aclose()
             
-            return {
-                "agent_id": agent_id,
-                "status": "success", 
-                "response": response,
-                "execution_time": execution_time,
-                "model": agent_model,
-                "estimated_cost": estimated_cost
-            }
+            return self._agent_success(agent_id, subtask, agent_model, response, execution_time)
             
         except Exception as e:
-            # Enhanced error handling with model-specific information
-            error_msg = f"Agent {agent_id} error"
-            if agent_model:
-                error_msg += f" (model: {agent_model})"
-            error_msg += f": {str(e)}"
-            
-            if not self.silent:
-                print(f"🚨 {error_msg}")
-            
-            return {
-                "agent_id": agent_id,
-                "status": "error",
-                "response": error_msg,
-                "execution_time": 0,
-                "model": agent_model or "unknown",
-                "estimated_cost": 0.0
-            }
+            return self._agent_error(agent_id, agent_model, e)
+    
+    async def _arun_agents(self, subtasks: List[str]) -> List[Dict[str, Any]]:
+        """Run all agents concurrently with asyncio.gather, applying the per-agent timeout"""
+        # One semaphore for the whole fan-out so agent.max_concurrency caps the
+        # LLM calls in flight across all agents
+        llm_semaphore = asyncio.Semaphore(self.config.get('agent', {}).get('max_concurrency', 10))
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self.arun_agent_parallel(i, subtasks[i], llm_semaphore), timeout=self.task_timeout)
+              for i in range(self.num_agents)),
+            return_exceptions=True
+        )
+        
+        agent_results = []
+        for agent_id, result in enumerate(results):
+            if isinstance(result, BaseException):
+                agent_results.append({
+                    "agent_id": agent_id,
+                    "status": "timeout",
+                    "response": f"Agent {agent_id + 1} timed out or failed: {str(result)}",
+                    "execution_time": self.task_timeout
+                })
+            else:
+                agent_results.append(result)
+        
+        return agent_results
     
     def _estimate_agent_cost(self, agent_id: int, model: str, input_length: int, output_length: int) -> float:
         """Estimate cost for an agent's execution (simplified calculation)."""
@@ -375,33 +464,9 @@ class TaskOrchestrator:
             agent_responses=agent_responses_text
         )
         
-        # Remove task completion tool to avoid premature completion
-        synthesis_agent.tools = [tool for tool in synthesis_agent.tools if tool.get('function', {}).get('name') != 'mark_task_complete']
-        synthesis_agent.tool_mapping = {name: func for name, func in synthesis_agent.tool_mapping.items() if name != 'mark_task_complete'}
-        
-        # Ensure we have at least one tool for DeepSeek
-        # We need to check if provider is DeepSeek and tools is empty
-        # The provider_type should be available from the config
-        if not synthesis_agent.tools:
-            # Check if we're using DeepSeek provider
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
-                provider_type = config.get('provider', {}).get('type', '')
-            
-            if provider_type == "deepseek":
-                dummy_tool = {
-                    "type": "function",
-                    "function": {
-                        "name": "dummy_tool",
-                        "description": "A dummy tool that does nothing",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {},
-                            "required": []
-                        }
-                    }
-                }
-                synthesis_agent.tools = [dummy_tool]
+        # Remove task completion tool to avoid premature completion; if no tools
+        # are left, the agent sends DUMMY_TOOL to providers (DeepSeek) that need one
+        synthesis_agent.remove_tools(_COMPLETION_TOOLS)
         
         # Get the synthesized response
         try:
@@ -521,26 +586,29 @@ class TaskOrchestrator:
             # Execute agents in parallel
             agent_results = []
             
-            with ThreadPoolExecutor(max_workers=self.num_agents) as executor:
-                # Submit all agent tasks
-                future_to_agent = {
-                    executor.submit(self.run_agent_parallel, i, subtasks[i]): i 
-                    for i in range(self.num_agents)
-                }
+            if self.async_agents:
+                agent_results = asyncio.run(self._arun_agents(subtasks))
+            else:
+                with ThreadPoolExecutor(max_workers=self.num_agents) as executor:
+                    # Submit all agent tasks
+                    future_to_agent = {
+                        executor.submit(self.run_agent_parallel, i, subtasks[i]): i 
+                        for i in range(self.num_agents)
+                    }
                 
-                # Collect results as they complete
-                for future in as_completed(future_to_agent, timeout=self.task_timeout):
-                    try:
-                        result = future.result()
-                        agent_results.append(result)
-                    except Exception as e:
-                        agent_id = future_to_agent[future]
-                        agent_results.append({
-                            "agent_id": agent_id,
-                            "status": "timeout",
-                            "response": f"Agent {agent_id + 1} timed out or failed: {str(e)}",
-                            "execution_time": self.task_timeout
-                        })
+                    # Collect results as they complete
+                    for future in as_completed(future_to_agent, timeout=self.task_timeout):
+                        try:
+                            result = future.result()
+                            agent_results.append(result)
+                        except Exception as e:
+                            agent_id = future_to_agent[future]
+                            agent_results.append({
+                                "agent_id": agent_id,
+                                "status": "timeout",
+                                "response": f"Agent {agent_id + 1} timed out or failed: {str(e)}",
+                                "execution_time": self.task_timeout
+                            })
             
             # Sort results by agent_id for consistent output
             agent_results.sort(key=lambda x: x["agent_id"])
@@ -3,10 +3,32 @@ Provider client factory for Make It Heavy framework.
 Creates appropriate OpenAI clients for different providers.
 """
 
-from typing import Dict, List
-from openai import OpenAI
+from typing import TYPE_CHECKING, Dict, List
 from config_manager import ProviderConfig, ConfigurationError, validate_deepseek_config, validate_openrouter_config
 
+if TYPE_CHECKING:
+    from openai import OpenAI, AsyncOpenAI
+
+
+# openai pulls in pydantic, httpx and a few hundred submodules, so it is only
+# imported when the first client is created
+_OPENAI_CLIENT_CLASSES = ("OpenAI", "AsyncOpenAI")
+
+
+def __getattr__(name):
+    """Resolve the openai client classes on first access (PEP 562)"""
+    if name in _OPENAI_CLIENT_CLASSES:
+        import openai
+        value = getattr(openai, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _client_class(name):
+    """Look up an openai client class, honouring one already bound on this module"""
+    return globals()[name] if name in globals() else __getattr__(name)
+
 
 class ProviderError(Exception):
     """Base class for provider-specific errors"""
@@ -29,7 +51,7 @@ class ProviderClientFactory:
     SUPPORTED_PROVIDERS = ["openrouter", "deepseek"]
     
     @staticmethod
-    def create_client(provider_config: ProviderConfig) -> OpenAI:
+    def create_client(provider_config: ProviderConfig) -> "OpenAI":
         """Creates appropriate OpenAI client for the specified provider"""
         try:
             # Validate configuration first
@@ -39,7 +61,7 @@ class ProviderClientFactory:
             )
             
             # Create OpenAI client with provider-specific configuration
-            client = OpenAI(
+            client = _client_class("OpenAI")(
                 api_key=provider_config.api_key,
                 base_url=provider_config.base_url
             )
@@ -55,6 +77,29 @@ class ProviderClientFactory:
             else:
                 raise ProviderError(f"Failed to create client for {provider_type}: {str(e)}")
     
+    @staticmethod
+    def create_async_client(provider_config: ProviderConfig) -> "AsyncOpenAI":
+        """Creates an asyncio-compatible OpenAI client for the specified provider"""
+        try:
+            ProviderClientFactory.validate_provider_config(
+                provider_config.provider_type, 
+                provider_config.additional_params
+            )
+            
+            return _client_class("AsyncOpenAI")(
+                api_key=provider_config.api_key,
+                base_url=provider_config.base_url
+            )
+            
+        except Exception as e:
+            provider_type = provider_config.provider_type
+            if provider_type == "deepseek":
+                raise DeepSeekAPIError(f"Failed to create DeepSeek async client: {str(e)}")
+            elif provider_type == "openrouter":
+                raise OpenRouterAPIError(f"Failed to create OpenRouter async client: {str(e)}")
+            else:
+                raise ProviderError(f"Failed to create async client for {provider_type}: {str(e)}")
+    
     @staticmethod
     def get_supported_providers() -> List[str]:
         """Returns list of supported providers"""
@@ -137,7 +182,7 @@ class ProviderClientFactory:
         return provider_models.get(model_name, provider_models.get("default", {}))
 
 
-def create_client_from_config(config_dict: Dict) -> OpenAI:
+def create_client_from_config(config_dict: Dict) -> "OpenAI":
     """Convenience function to create client directly from config dictionary"""
     from config_manager import ConfigurationManager
     
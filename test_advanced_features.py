@@ -239,6 +239,136 @@ class TestAdvancedFeatures(unittest.TestCase):
         self.assertEqual(len(alerts_triggered), 3)
         self.assertEqual(alerts_triggered[2].alert_type, 'budget_exceeded')
     
+    def test_cost_monitor_custom_alert_below_current_cost(self):
+        """Test alerts fire in threshold order, including ones added below the current cost."""
+        alerts_triggered = []
+        monitor = CostMonitor(alert_callback=alerts_triggered.append)
+        monitor.add_custom_alert(0.05, "Five cents")
+        monitor.add_custom_alert(0.01, "One cent")
+        
+        monitor.record_agent_cost(0, 'test-model', 10, 5, 0.02)
+        self.assertEqual([alert.message for alert in alerts_triggered], ["One cent"])
+        
+        # Added after the cost already passed its threshold
+        monitor.add_custom_alert(0.015, "One and a half cents")
+        monitor.record_agent_cost(0, 'test-model', 10, 5, 0.04)
+        self.assertEqual([alert.message for alert in alerts_triggered],
+                         ["One cent", "One and a half cents", "Five cents"])
+    
+    def test_cost_monitor_concurrent_recording(self):
+        """Test concurrent recording from many agents loses no entries and fires each alert once."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        alerts_triggered = []
+        monitor = CostMonitor(budget_limit=1.0, alert_callback=alerts_triggered.append)
+        
+        def record(agent_id):
+            for _ in range(100):
+                monitor.record_agent_cost(agent_id, 'test-model', 10, 5, 0.001)
+        
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            list(executor.map(record, range(20)))
+        
+        summary = monitor.get_cost_summary()
+        self.assertEqual(summary['total_entries'], 2000)
+        self.assertAlmostEqual(summary['total_cost'], 2.0)
+        self.assertEqual(len(summary['agent_costs']), 20)
+        self.assertAlmostEqual(summary['agent_costs'][7], 0.1)
+        self.assertEqual(sorted(alert.alert_type for alert in alerts_triggered),
+                         ['budget_exceeded', 'critical', 'warning'])
+    
+    def test_cost_monitor_batch_recording(self):
+        """Test a batch is recorded like individual calls and notifies listeners once."""
+        deltas = []
+        alerts_triggered = []
+        monitor = CostMonitor(budget_limit=0.01, alert_callback=alerts_triggered.append)
+        monitor.add_cost_listener(deltas.append)
+        
+        monitor.record_agent_costs([
+            (0, 'test-model', 1000, 500, 0.004),
+            (1, 'test-model', 1000, 500, 0.004),
+            (0, 'test-model-2', 2000, 1000, 0.002)
+        ])
+        
+        summary = monitor.get_cost_summary()
+        self.assertEqual(summary['total_entries'], 3)
+        self.assertAlmostEqual(summary['agent_costs'][0], 0.006)
+        self.assertEqual(summary['model_usage']['test-model']['calls'], 2)
+        self.assertEqual(len(deltas), 1)
+        self.assertAlmostEqual(deltas[0], 0.01)
+        self.assertEqual(sorted(alert.alert_type for alert in alerts_triggered),
+                         ['budget_exceeded', 'critical', 'warning'])
+        
+        monitor.record_agent_costs([])
+        self.assertEqual(len(deltas), 1)
+    
+    def test_cost_monitor_stripes_by_agent_id(self):
+        """Test agents sharing a stripe (including the synthesis agent id -1) keep separate totals."""
+        monitor = CostMonitor(budget_limit=1.0)
+        self.assertIs(monitor._stripe_for(-1), monitor._stripe_for(15))
+        
+        monitor.record_agent_cost(-1, 'test-model', 10, 5, 0.001)
+        monitor.record_agent_cost(15, 'test-model', 10, 5, 0.002)
+        
+        summary = monitor.get_cost_summary()
+        self.assertEqual(dict(summary['agent_costs']), {-1: 0.001, 15: 0.002})
+        self.assertEqual(monitor.get_real_time_stats()['active_agents'], 2)
+    
+    def test_cost_monitor_bounded_history(self):
+        """Test detailed entries are capped while aggregates cover the whole session."""
+        monitor = CostMonitor(budget_limit=1.0, max_entries=5)
+        
+        for i in range(20):
+            monitor.record_agent_cost(0, 'test-model', 10, 5, 0.01)
+        
+        summary = monitor.get_cost_summary()
+        self.assertEqual(len(monitor.cost_entries), 5)
+        self.assertEqual(summary['total_entries'], 20)
+        self.assertAlmostEqual(summary['total_cost'], 0.2)
+        self.assertEqual(summary['model_usage']['test-model']['calls'], 20)
+    
+    def test_cost_monitor_reports_on_budget_bucket_crossing(self):
+        """Test the monitoring thread reports when usage enters a new quarter of the budget."""
+        import time
+        
+        monitor = CostMonitor(budget_limit=1.0, alert_callback=lambda alert: None)
+        with patch('builtins.print') as mock_print:
+            monitor.start_monitoring(check_interval=0.01)
+            monitor.record_agent_cost(0, 'test-model', 10, 5, 0.1)  # 10%: no new bucket
+            monitor.record_agent_cost(0, 'test-model', 10, 5, 0.3)  # 40%: second bucket
+            time.sleep(0.2)
+            monitor.stop_monitoring()
+        
+        self.assertFalse(monitor.monitor_thread.is_alive())
+        reports = [call.args[0] for call in mock_print.call_args_list]
+        self.assertEqual(len(reports), 1)
+        self.assertIn("40.0% of budget", reports[0])
+    
+    def test_cost_monitor_summary_reuses_aggregates_until_changed(self):
+        """Test repeated summaries reuse the merged aggregates until a cost is recorded."""
+        monitor = CostMonitor(budget_limit=1.0)
+        monitor.record_agent_cost(0, 'test-model', 10, 5, 0.001)
+        
+        # Summaries hold plain copies, so callers may modify or serialize them
+        first = monitor.get_cost_summary()
+        first['agent_costs'][0] = 99.0
+        first['model_usage']['test-model']['calls'] = 99
+        json.dumps(first)
+        self.assertIs(monitor._snapshot(), monitor._snapshot())
+        second = monitor.get_cost_summary()
+        self.assertEqual(second['agent_costs'][0], 0.001)
+        self.assertEqual(second['model_usage']['test-model']['calls'], 1)
+        
+        copy = monitor.agent_costs
+        copy[0] = 99.0
+        self.assertEqual(monitor.get_cost_summary()['agent_costs'][0], 0.001)
+        
+        monitor.record_agent_cost(1, 'test-model', 10, 5, 0.002)
+        self.assertAlmostEqual(monitor.get_cost_summary()['total_cost'], 0.003)
+        
+        monitor.reset_session()
+        self.assertEqual(monitor.get_cost_summary()['total_cost'], 0.0)
+    
     def test_cost_monitor_real_time_stats(self):
         """Test real-time cost statistics."""
         monitor = CostMonitor(budget_limit=1.0)
@@ -254,6 +384,44 @@ class TestAdvancedFeatures(unittest.TestCase):
         self.assertEqual(stats['active_agents'], 2)
         self.assertEqual(stats['budget_status'], 'OK')
     
+    def test_cost_monitor_real_time_stats_without_locks(self):
+        """Test real-time stats are served while writers hold every stripe lock."""
+        import threading
+        
+        monitor = CostMonitor(budget_limit=1.0)
+        monitor.record_agent_cost(0, 'test-model', 10, 5, 0.001)
+        
+        results = []
+        with monitor._all_stripes_locked():
+            reader = threading.Thread(target=lambda: results.append(monitor.get_real_time_stats()))
+            reader.start()
+            reader.join(timeout=2.0)
+        
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['recent_cost_1min'], 0.001)
+        self.assertEqual(results[0]['active_agents'], 1)
+    
+    def test_cost_monitor_real_time_stats_window_expiry(self):
+        """Test entries leave the recent window once they are older than a minute."""
+        monitor = CostMonitor(budget_limit=1.0)
+        
+        with patch('cost_monitor.time.monotonic', return_value=1000.0):
+            monitor.record_agent_cost(0, 'test-model', 10, 5, 0.001)
+            monitor.record_agent_cost(0, 'test-model', 10, 5, 0.001)
+        with patch('cost_monitor.time.monotonic', return_value=1030.0):
+            monitor.record_agent_cost(1, 'test-model', 10, 5, 0.002)
+        
+        with patch('cost_monitor.time.monotonic', return_value=1070.0):
+            stats = monitor.get_real_time_stats()
+        self.assertAlmostEqual(stats['recent_cost_1min'], 0.002)
+        self.assertEqual(stats['active_agents'], 1)
+        self.assertAlmostEqual(stats['current_total'], 0.004)
+        
+        with patch('cost_monitor.time.monotonic', return_value=1100.0):
+            stats = monitor.get_real_time_stats()
+        self.assertEqual(stats['recent_cost_1min'], 0.0)
+        self.assertEqual(stats['active_agents'], 0)
+    
     def test_cost_monitor_export_report(self):
         """Test cost monitoring report export."""
         monitor = CostMonitor(budget_limit=1.0)
@@ -276,6 +444,32 @@ class TestAdvancedFeatures(unittest.TestCase):
         self.assertIn('detailed_entries', detailed_report)
         self.assertEqual(len(detailed_report['detailed_entries']), 2)
     
+    def test_cost_monitor_export_report_stream(self):
+        """Test the streamed report is valid JSON matching the in-memory export."""
+        import io
+        
+        monitor = CostMonitor(budget_limit=0.003, alert_callback=lambda alert: None)
+        
+        empty = io.StringIO()
+        monitor.export_cost_report_stream(empty)
+        self.assertEqual(json.loads(empty.getvalue())['detailed_entries'], [])
+        
+        monitor.record_agent_cost(0, 'test-model', 1000, 500, 0.001)
+        monitor.record_agent_cost(1, 'test-model-2', 1500, 750, 0.002)
+        
+        stream = io.StringIO()
+        monitor.export_cost_report_stream(stream)
+        report = json.loads(stream.getvalue())
+        
+        expected = monitor.export_cost_report(include_detailed_entries=True)
+        self.assertEqual(report['detailed_entries'], expected['detailed_entries'])
+        self.assertEqual(report['session_summary']['agent_costs'], {'0': 0.001, '1': 0.002})
+        self.assertEqual(report['session_summary']['alerts_triggered'][0]['alert_type'], 'warning')
+        
+        summary_only = io.StringIO()
+        monitor.export_cost_report_stream(summary_only, include_detailed_entries=False)
+        self.assertNotIn('detailed_entries', json.loads(summary_only.getvalue()))
+    
     def test_budget_manager(self):
         """Test budget manager functionality."""
         manager = BudgetManager()
@@ -300,6 +494,46 @@ class TestAdvancedFeatures(unittest.TestCase):
         self.assertEqual(summary['active_monitors'], 2)
         self.assertIn('session1', summary['monitor_summaries'])
         self.assertIn('session2', summary['monitor_summaries'])
+        
+        # The light summary uses the running totals only
+        light = manager.get_global_summary(full=False)
+        self.assertNotIn('monitor_summaries', light)
+        self.assertAlmostEqual(light['monitor_costs']['session2'], 0.2)
+        
+        monitor1.reset_session()
+        self.assertAlmostEqual(manager.get_global_summary(full=False)['total_cost_all_monitors'], 0.2)
+    
+    def test_budget_manager_ignores_replaced_monitor(self):
+        """Test costs recorded on a replaced monitor no longer count."""
+        manager = BudgetManager()
+        old_monitor = manager.create_monitor('session')
+        new_monitor = manager.create_monitor('session')
+        
+        old_monitor.record_agent_cost(0, 'model1', 1000, 500, 0.3)
+        
+        summary = manager.get_global_summary()
+        self.assertEqual(summary['total_cost_all_monitors'], 0.0)
+        self.assertEqual(summary['monitor_costs']['session'], 0.0)
+        self.assertEqual(summary['monitor_summaries']['session']['total_cost'], 0.0)
+        
+        new_monitor.record_agent_cost(0, 'model1', 1000, 500, 0.2)
+        self.assertAlmostEqual(manager.get_global_summary(full=False)['total_cost_all_monitors'], 0.2)
+    
+    @patch('builtins.print')
+    def test_failing_cost_listener_is_quiet_when_silent(self, mock_print):
+        """Test a failing cost listener does not print on a silent monitor."""
+        monitor = CostMonitor(silent=True)
+        deltas = []
+        
+        def failing_listener(delta):
+            raise RuntimeError("listener broke")
+        
+        monitor.add_cost_listener(failing_listener)
+        monitor.add_cost_listener(deltas.append)
+        monitor.record_agent_cost(0, 'model1', 1000, 500, 0.1)
+        
+        self.assertEqual(deltas, [0.1])
+        mock_print.assert_not_called()
     
     def test_orchestrator_cost_monitoring_integration(self):
         """Test orchestrator integration with cost monitoring."""
@@ -5,6 +5,8 @@ Unit tests for configuration management and provider factory.
 import pytest
 import tempfile
 import os
+import subprocess
+import sys
 import yaml
 from unittest.mock import patch, MagicMock
 
@@ -13,7 +15,8 @@ from config_manager import (
     ProviderConfig, 
     ConfigurationError,
     validate_deepseek_config,
-    validate_openrouter_config
+    validate_openrouter_config,
+    write_yaml_atomic
 )
 from provider_factory import (
     ProviderClientFactory,
@@ -114,6 +117,40 @@ class TestConfigurationManager:
         finally:
             os.unlink(config_path)
     
+    def test_load_config_cached_until_file_changes(self):
+        """Test repeated loads reuse the parse but return independent dicts"""
+        config_data = {'provider': {'type': 'deepseek'}, 'agent': {'max_iterations': 10}}
+        config_path = self.create_temp_config(config_data)
+        
+        try:
+            first = ConfigurationManager().load_config(config_path)
+            first['agent']['max_iterations'] = 99
+            second = ConfigurationManager().load_config(config_path)
+            assert second['agent']['max_iterations'] == 10
+            
+            # Rewriting the file invalidates the cached parse
+            with open(config_path, 'w') as f:
+                yaml.dump({'provider': {'type': 'openrouter'}}, f)
+            third = ConfigurationManager().load_config(config_path)
+            assert third == {'provider': {'type': 'openrouter'}}
+        finally:
+            os.unlink(config_path)
+    
+    def test_save_multi_model_config_round_trip(self):
+        """Test saving replaces the file atomically and reloads the new content"""
+        config_path = self.create_temp_config({'provider': {'type': 'deepseek'}})
+        
+        try:
+            manager = ConfigurationManager()
+            manager.load_config(config_path)
+            manager.save_multi_model_config({'default_model': 'deepseek-chat'})
+            
+            assert not os.path.exists(config_path + ".tmp")
+            reloaded = ConfigurationManager().load_config(config_path)
+            assert reloaded['multi_model'] == {'default_model': 'deepseek-chat'}
+        finally:
+            os.unlink(config_path)
+    
     def test_load_config_file_not_found(self):
         """Test config loading with non-existent file"""
         manager = ConfigurationManager()
@@ -177,6 +214,21 @@ class TestConfigurationManager:
         manager.config = config_data
         
         assert manager.get_active_provider() == 'deepseek'
+    
+    def test_write_yaml_atomic_keeps_file_mode(self):
+        """Test atomic YAML writes keep the target's permissions and leave no temp files"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'config.yaml')
+            with open(path, 'w') as f:
+                f.write('old: true\n')
+            os.chmod(path, 0o600)
+            
+            write_yaml_atomic(path, {'deepseek': {'api_key': 'secret'}})
+            
+            assert os.stat(path).st_mode & 0o777 == 0o600
+            with open(path) as f:
+                assert yaml.safe_load(f) == {'deepseek': {'api_key': 'secret'}}
+            assert os.listdir(tmp_dir) == ['config.yaml']
 
 
 class TestProviderValidation:
@@ -243,6 +295,15 @@ class TestProviderClientFactory:
         )
         assert client == mock_client
     
+    def test_importing_agent_defers_openai(self):
+        """Test openai is not imported until a client is created"""
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, agent; print('openai' in sys.modules)"],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        
+        assert result.stdout.strip() == "False"
+    
     def test_get_supported_providers(self):
         """Test getting supported providers"""
         providers = ProviderClientFactory.get_supported_providers()
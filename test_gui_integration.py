@@ -7,7 +7,9 @@ Tests the complete integration without actually opening the GUI.
 import sys
 import os
 import time
+import tempfile
 import threading
+import yaml
 from unittest.mock import Mock, patch
 
 # Add current directory to path
@@ -135,6 +137,35 @@ def test_config_integration():
         return False
 
 
+def test_update_config_keeps_file_mode():
+    """Test update_config rewrites the config without loosening its permissions"""
+    print("\nTesting update_config file permissions...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = os.path.join(tmp_dir, "config.yaml")
+        with open(config_path, "w") as f:
+            yaml.dump({
+                'provider': {'type': 'deepseek'},
+                'deepseek': {
+                    'api_key': 'old-key',
+                    'base_url': 'https://api.deepseek.com',
+                    'model': 'deepseek-chat'
+                }
+            }, f)
+        os.chmod(config_path, 0o600)
+        
+        agent_manager = AgentManager(config_path=config_path)
+        agent_manager.update_config("deepseek", "deepseek-reasoner", "new-key")
+        
+        assert os.stat(config_path).st_mode & 0o777 == 0o600
+        with open(config_path) as f:
+            assert yaml.safe_load(f)['deepseek']['api_key'] == 'new-key'
+        assert os.listdir(tmp_dir) == ["config.yaml"]
+        print("✓ Config file mode kept after update")
+    
+    return True
+
+
 def test_main_app_initialization():
     """Test MainApplication initialization without GUI"""
     print("\nTesting MainApplication initialization...")
@@ -251,6 +282,7 @@ def main():
         test_chat_interface_agent_integration,
         test_progress_callback_integration,
         test_config_integration,
+        test_update_config_keeps_file_mode,
         test_main_app_initialization,
         test_end_to_end_flow
     ]
@@ -0,0 +1,125 @@
+"""
+Unit tests for the LLM response cache.
+"""
+
+import os
+import tempfile
+import pytest
+import yaml
+from unittest.mock import patch, MagicMock
+
+from agent import UniversalAgent
+from config_manager import ConfigurationError
+from llm_cache import (
+    LLMCache, MemoryLRUCache, create_llm_cache, make_cache_key,
+    serialize_response, deserialize_response
+)
+
+
+def make_response(content, tool_calls=None):
+    """Build a mock chat completion response"""
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    response.choices[0].message.tool_calls = tool_calls
+    return response
+
+
+class TestMemoryLRUCache:
+    """Test the in-memory LRU backend"""
+
+    def test_evicts_least_recently_used(self):
+        cache = MemoryLRUCache(maxsize=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+
+class TestLLMCache:
+    """Test key generation, serialization and counters"""
+
+    def test_cache_key_is_order_independent(self):
+        messages = [{"role": "user", "content": "Hi"}]
+        key1 = make_cache_key("deepseek-chat", messages, [{"type": "function", "function": {"name": "a"}}])
+        key2 = make_cache_key("deepseek-chat", messages, [{"function": {"name": "a"}, "type": "function"}])
+        key3 = make_cache_key("deepseek-reasoner", messages, None)
+
+        assert key1 == key2
+        assert key1 != key3
+
+    def test_response_round_trip(self):
+        tool_call = MagicMock()
+        tool_call.id = "call_1"
+        tool_call.function.name = "search_web"
+        tool_call.function.arguments = '{"query": "test"}'
+
+        restored = deserialize_response(serialize_response(make_response(None, [tool_call])))
+
+        message = restored.choices[0].message
+        assert message.content is None
+        assert message.tool_calls[0].id == "call_1"
+        assert message.tool_calls[0].function.name == "search_web"
+        assert message.tool_calls[0].function.arguments == '{"query": "test"}'
+
+    def test_hit_miss_counters(self):
+        cache = LLMCache(MemoryLRUCache())
+
+        assert cache.get("key") is None
+        cache.set("key", make_response("Hello"))
+        assert cache.get("key").choices[0].message.content == "Hello"
+
+        assert cache.get_stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    def test_create_llm_cache_from_config(self):
+        assert create_llm_cache({}) is None
+        assert create_llm_cache({'enabled': False}) is None
+        assert isinstance(create_llm_cache({'enabled': True}).backend, MemoryLRUCache)
+
+        with pytest.raises(ConfigurationError):
+            create_llm_cache({'enabled': True, 'backend': 'unknown'})
+
+
+class TestAgentLLMCache:
+    """Test that UniversalAgent short-circuits repeated calls"""
+
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_call_llm_uses_cache(self, mock_openai, mock_discover_tools):
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = make_response("Cached answer")
+        mock_openai.return_value = mock_client
+        mock_discover_tools.return_value = {}
+
+        config_data = {
+            'provider': {'type': 'deepseek'},
+            'deepseek': {
+                'api_key': 'test-deepseek-key',
+                'base_url': 'https://api.deepseek.com',
+                'model': 'deepseek-chat'
+            },
+            'system_prompt': 'You are a helpful assistant.',
+            'agent': {'max_iterations': 10, 'cache': {'enabled': True}}
+        }
+        temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False)
+        yaml.dump(config_data, temp_file)
+        temp_file.close()
+
+        try:
+            agent = UniversalAgent(temp_file.name, silent=True)
+            messages = [{"role": "user", "content": "Hello"}]
+
+            first = agent.call_llm(messages)
+            second = agent.call_llm(messages)
+
+            assert first.choices[0].message.content == "Cached answer"
+            assert second.choices[0].message.content == "Cached answer"
+            assert mock_client.chat.completions.create.call_count == 1
+            assert agent.llm_cache.get_stats()['hits'] == 1
+
+        finally:
+            os.unlink(temp_file.name)
@@ -5,10 +5,11 @@ Tests the enhanced TaskOrchestrator with multi-model support.
 """
 
 import os
+import asyncio
 import yaml
 import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from orchestrator import TaskOrchestrator
 from model_config.data_models import AgentModelConfig
 
@@ -196,6 +197,35 @@ class TestMultiModelOrchestrator(unittest.TestCase):
         self.assertIsNone(summary['synthesis_model'])
         self.assertEqual(summary['total_estimated_cost'], 0.0)
     
+    def test_progress_listeners_receive_updates(self):
+        """Test progress listeners are called with each status update."""
+        orchestrator = TaskOrchestrator(self.config_path, silent=True)
+        updates = []
+        orchestrator.add_progress_listener(lambda agent_id, status: updates.append((agent_id, status)))
+        
+        orchestrator.update_agent_progress(0, "PROCESSING...")
+        orchestrator.update_agent_progress(0, "COMPLETED", "done")
+        
+        self.assertEqual(updates, [(0, "PROCESSING..."), (0, "COMPLETED")])
+        self.assertEqual(orchestrator.get_progress_status(), {0: "COMPLETED"})
+    
+    @patch('builtins.print')
+    def test_failing_progress_listener_is_quiet_when_silent(self, mock_print):
+        """Test a failing progress listener does not print in silent mode."""
+        orchestrator = TaskOrchestrator(self.config_path, silent=True)
+        updates = []
+        
+        def failing_listener(agent_id, status):
+            raise RuntimeError("listener broke")
+        
+        orchestrator.add_progress_listener(failing_listener)
+        orchestrator.add_progress_listener(lambda agent_id, status: updates.append((agent_id, status)))
+        
+        orchestrator.update_agent_progress(0, "PROCESSING...")
+        
+        self.assertEqual(updates, [(0, "PROCESSING...")])
+        mock_print.assert_not_called()
+    
     def test_get_execution_summary_with_multi_model(self):
         """Test execution summary with multi-model configuration."""
         config_with_multi_model = self.basic_config.copy()
@@ -257,6 +287,45 @@ class TestMultiModelOrchestrator(unittest.TestCase):
         self.assertIn('Test error', result['response'])
         self.assertEqual(result['estimated_cost'], 0.0)
     
+    @patch('orchestrator.TaskOrchestrator._create_agent_with_model')
+    @patch('orchestrator.TaskOrchestrator._estimate_agent_cost')
+    def test_async_agents_share_llm_semaphore(self, mock_estimate_cost, mock_create_agent):
+        """Test async agents share one LLM semaphore and close their clients."""
+        config = dict(self.basic_config, agent={'max_iterations': 3, 'max_concurrency': 1})
+        with open(self.config_path, 'w') as f:
+            yaml.dump(config, f)
+        
+        agents = []
+        in_flight = []
+        peak = []
+        
+        def make_agent(agent_id, model):
+            agent = MagicMock()
+            
+            async def arun(subtask):
+                async with agent.llm_semaphore:
+                    in_flight.append(agent_id)
+                    peak.append(len(in_flight))
+                    await asyncio.sleep(0.01)
+                    in_flight.remove(agent_id)
+                return f"Response {agent_id}"
+            
+            agent.arun = arun
+            agent.aclose = AsyncMock()
+            agents.append(agent)
+            return agent
+        
+        mock_create_agent.side_effect = make_agent
+        mock_estimate_cost.return_value = 0.0
+        
+        orchestrator = TaskOrchestrator(self.config_path, silent=True)
+        results = asyncio.run(orchestrator._arun_agents(["Task 1", "Task 2"]))
+        
+        self.assertEqual([r['status'] for r in results], ['success', 'success'])
+        self.assertEqual(max(peak), 1)
+        for agent in agents:
+            agent.aclose.assert_awaited_once()
+    
     @patch('orchestrator.TaskOrchestrator.run_agent_parallel')
     @patch('orchestrator.TaskOrchestrator.decompose_task')
     def test_orchestrate_with_multi_model_logging(self, mock_decompose, mock_run_agent):
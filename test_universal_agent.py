@@ -3,12 +3,16 @@ Unit tests for UniversalAgent class.
 """
 
 import pytest
+import asyncio
+import json
 import tempfile
+import time
 import os
 import yaml
-from unittest.mock import patch, MagicMock, mock_open
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock, AsyncMock, mock_open
 
-from agent import UniversalAgent, OpenRouterAgent
+from agent import UniversalAgent, OpenRouterAgent, DUMMY_TOOL
 from config_manager import ConfigurationError
 from provider_factory import ProviderError, DeepSeekAPIError, OpenRouterAPIError
 
@@ -184,6 +188,133 @@ class TestUniversalAgent:
         finally:
             os.unlink(config_path)
     
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_tools_reassignment_updates_payload(self, mock_openai, mock_discover_tools):
+        """Test the precomputed tools payload follows tools reassignment"""
+        # Setup mocks
+        mock_tool = MagicMock()
+        mock_tool.to_openrouter_schema.return_value = {"type": "function", "function": {"name": "search_web"}}
+        mock_discover_tools.return_value = {"search_web": mock_tool}
+        mock_openai.return_value = MagicMock()
+        
+        config_data = self.create_deepseek_config()
+        config_path = self.create_temp_config(config_data)
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            messages = [{"role": "user", "content": "Hello"}]
+            assert agent._build_api_params(messages)["tools"] == agent.tools
+            
+            # DeepSeek needs a non-empty tools array once all tools are removed
+            agent.tools = []
+            assert agent._build_api_params(messages)["tools"] == [DUMMY_TOOL]
+        
+        finally:
+            os.unlink(config_path)
+    
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_remove_tools_updates_schemas_and_mapping(self, mock_openai, mock_discover_tools):
+        """Test removing tools drops them from both the schemas and the mapping"""
+        # Setup mocks
+        tools = {}
+        for name in ("search_web", "mark_task_complete"):
+            tools[name] = MagicMock()
+            tools[name].to_openrouter_schema.return_value = {"type": "function", "function": {"name": name}}
+        mock_discover_tools.return_value = tools
+        mock_openai.return_value = MagicMock()
+        
+        config_path = self.create_temp_config(self.create_deepseek_config())
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            agent.remove_tools(("mark_task_complete",))
+            
+            assert [tool["function"]["name"] for tool in agent.tools] == ["search_web"]
+            assert list(agent.tool_mapping) == ["search_web"]
+            
+            agent.remove_tools(("search_web",))
+            assert agent._build_api_params([])["tools"] == [DUMMY_TOOL]
+        
+        finally:
+            os.unlink(config_path)
+    
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_tool_batch_with_side_effects_runs_in_order(self, mock_openai, mock_discover_tools):
+        """Test a write followed by a read in one turn does not race"""
+        calls = []
+        
+        def write_file(path):
+            time.sleep(0.05)
+            calls.append(("write_file", path))
+            return {"success": True}
+        
+        def read_file(path):
+            calls.append(("read_file", path))
+            return {"content": "data"}
+        
+        mock_discover_tools.return_value = {
+            name: SimpleNamespace(
+                to_openrouter_schema=lambda name=name: {"type": "function", "function": {"name": name}},
+                execute=fn,
+                read_only=read_only
+            )
+            for name, fn, read_only in (("write_file", write_file, False), ("read_file", read_file, True))
+        }
+        mock_openai.return_value = MagicMock()
+        
+        config_path = self.create_temp_config(self.create_deepseek_config())
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            assert agent.read_only_tools == {"read_file"}
+            
+            tool_calls = [
+                SimpleNamespace(id=str(i), function=SimpleNamespace(name=name, arguments='{"path": "a.txt"}'))
+                for i, name in enumerate(("write_file", "read_file"))
+            ]
+            tool_args = [{"path": "a.txt"}, {"path": "a.txt"}]
+            
+            agent._execute_tool_calls(tool_calls, tool_args, [], MagicMock())
+            assert [name for name, _ in calls] == ["write_file", "read_file"]
+            
+            calls.clear()
+            asyncio.run(agent._aexecute_tool_calls(tool_calls, tool_args, [], MagicMock()))
+            assert [name for name, _ in calls] == ["write_file", "read_file"]
+        
+        finally:
+            os.unlink(config_path)
+    
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_prebaked_request_body(self, mock_openai, mock_discover_tools):
+        """Test prebaked requests splice the serialized tools into the body"""
+        # Setup mocks
+        mock_tool = MagicMock()
+        mock_tool.to_openrouter_schema.return_value = {"type": "function", "function": {"name": "search_web"}}
+        mock_discover_tools.return_value = {"search_web": mock_tool}
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        
+        config_data = self.create_deepseek_config()
+        config_data['agent']['prebaked_requests'] = True
+        config_path = self.create_temp_config(config_data)
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            messages = [{"role": "user", "content": "Hello"}]
+            
+            agent.call_llm(messages)
+            
+            mock_client.chat.completions.create.assert_not_called()
+            body = json.loads(mock_client.post.call_args.kwargs['content'])
+            assert body == {"model": "deepseek-chat", "tools": list(agent.tools), "messages": messages}
+        
+        finally:
+            os.unlink(config_path)
+    
     @patch('agent.discover_tools')
     @patch('provider_factory.OpenAI')
     def test_call_llm_deepseek_error(self, mock_openai, mock_discover_tools):
@@ -206,6 +337,359 @@ class TestUniversalAgent:
             
         finally:
             os.unlink(config_path)
+    
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_call_llm_rate_limit_hint(self, mock_openai, mock_discover_tools):
+        """Test rate limit errors are classified by exception type"""
+        import openai
+        
+        # Setup mocks
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.side_effect = openai.RateLimitError(
+            "Too many requests", response=MagicMock(status_code=429), body=None
+        )
+        mock_openai.return_value = mock_client
+        mock_discover_tools.return_value = {}
+        
+        config_data = self.create_deepseek_config()
+        config_path = self.create_temp_config(config_data)
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            messages = [{"role": "user", "content": "Hello"}]
+            
+            with pytest.raises(DeepSeekAPIError, match="DeepSeek rate limit reached"):
+                agent.call_llm(messages)
+            
+        finally:
+            os.unlink(config_path)
+
+    @patch('agent.discover_tools')
+    @patch('provider_factory.AsyncOpenAI')
+    @patch('provider_factory.OpenAI')
+    def test_arun_uses_async_client(self, mock_openai, mock_async_openai, mock_discover_tools):
+        """Test async run awaits the async client"""
+        # Setup mocks
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Async hello"
+        mock_response.choices[0].message.tool_calls = None
+        mock_async_client = MagicMock()
+        mock_async_client.chat.completions.create = AsyncMock(return_value=mock_response)
+        mock_async_openai.return_value = mock_async_client
+        mock_discover_tools.return_value = {}
+        
+        config_data = self.create_deepseek_config()
+        config_data['agent']['max_iterations'] = 1
+        config_path = self.create_temp_config(config_data)
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            
+            response = asyncio.run(agent.arun("Hello"))
+            
+            assert response == "Async hello"
+            mock_async_client.chat.completions.create.assert_awaited_once()
+            mock_openai.return_value.chat.completions.create.assert_not_called()
+            
+        finally:
+            os.unlink(config_path)
+
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_handle_tool_call_reuses_cached_result(self, mock_openai, mock_discover_tools):
+        """Test duplicate calls to a cacheable tool execute it only once"""
+        # Setup mocks
+        mock_tool = MagicMock()
+        mock_tool.to_openrouter_schema.return_value = {"type": "function", "function": {"name": "search_web"}}
+        mock_tool.execute.return_value = {"results": ["a"]}
+        mock_discover_tools.return_value = {"search_web": mock_tool}
+        mock_openai.return_value = MagicMock()
+        
+        config_data = self.create_deepseek_config()
+        config_path = self.create_temp_config(config_data)
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            
+            results = []
+            for call_id in ("call_1", "call_2"):
+                tool_call = MagicMock()
+                tool_call.id = call_id
+                tool_call.function.name = "search_web"
+                tool_call.function.arguments = '{"query": "test"}'
+                results.append(agent.handle_tool_call(tool_call))
+            
+            mock_tool.execute.assert_called_once_with(query="test")
+            assert results[0]["content"] == results[1]["content"]
+            assert results[1]["tool_call_id"] == "call_2"
+            assert agent.get_tool_cache_stats()["search_web"]["hits"] == 1
+            
+        finally:
+            os.unlink(config_path)
+
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_tool_cache_stats_count_concurrent_calls(self, mock_openai, mock_discover_tools):
+        """Test cache lookups from a concurrent read-only batch are all counted"""
+        mock_tool = MagicMock()
+        mock_tool.to_openrouter_schema.return_value = {"type": "function", "function": {"name": "search_web"}}
+        mock_tool.execute.return_value = {"results": ["a"]}
+        mock_tool.read_only = True
+        mock_discover_tools.return_value = {"search_web": mock_tool}
+        mock_openai.return_value = MagicMock()
+        
+        config_data = self.create_deepseek_config()
+        config_path = self.create_temp_config(config_data)
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            
+            tool_calls = []
+            for i in range(32):
+                tool_call = MagicMock()
+                tool_call.id = f"call_{i}"
+                tool_call.function.name = "search_web"
+                tool_call.function.arguments = f'{{"query": "q{i % 4}"}}'
+                tool_calls.append(tool_call)
+            tool_args = [json.loads(tool_call.function.arguments) for tool_call in tool_calls]
+            
+            agent._execute_tool_calls(tool_calls, tool_args, [], [])
+            
+            stats = agent.get_tool_cache_stats()["search_web"]
+            assert stats["hits"] + stats["misses"] == 32
+            assert stats["misses"] == mock_tool.execute.call_count
+            
+        finally:
+            os.unlink(config_path)
+
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_parallel_tool_calls_keep_call_order(self, mock_openai, mock_discover_tools):
+        """Test read-only tool calls from one assistant turn run concurrently and keep their order"""
+        # Setup mocks: the first call is slowest so completion order differs from call order
+        def slow_execute(delay):
+            time.sleep(delay)
+            return {"delay": delay}
+        
+        mock_tool = MagicMock()
+        mock_tool.to_openrouter_schema.return_value = {"type": "function", "function": {"name": "slow_tool"}}
+        mock_tool.execute.side_effect = slow_execute
+        mock_tool.read_only = True
+        mock_discover_tools.return_value = {"slow_tool": mock_tool}
+        mock_openai.return_value = MagicMock()
+        
+        config_data = self.create_deepseek_config()
+        config_path = self.create_temp_config(config_data)
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            
+            tool_calls = []
+            for i, delay in enumerate((0.2, 0.1, 0.0)):
+                tool_call = MagicMock()
+                tool_call.id = f"call_{i}"
+                tool_call.function.name = "slow_tool"
+                tool_call.function.arguments = f'{{"delay": {delay}}}'
+                tool_calls.append(tool_call)
+            
+            messages = []
+            start_time = time.time()
+            tool_args = [json.loads(tool_call.function.arguments) for tool_call in tool_calls]
+            completed = agent._execute_tool_calls(tool_calls, tool_args, messages, [])
+            elapsed = time.time() - start_time
+            
+            assert completed is False
+            assert [m["tool_call_id"] for m in messages] == ["call_0", "call_1", "call_2"]
+            assert elapsed < 0.3, f"Tool calls took {elapsed}s, suggesting sequential execution"
+        
+        finally:
+            os.unlink(config_path)
+    
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_tool_cache_cleared_by_tool_with_side_effects(self, mock_openai, mock_discover_tools):
+        """Test a cached read is not replayed after a write"""
+        files = {"a.txt": "old"}
+        
+        def write_file(path, content):
+            files[path] = content
+            return {"success": True}
+        
+        mock_discover_tools.return_value = {
+            name: SimpleNamespace(
+                to_openrouter_schema=lambda name=name: {"type": "function", "function": {"name": name}},
+                execute=fn,
+                read_only=read_only
+            )
+            for name, fn, read_only in (
+                ("read_file", lambda path: {"content": files[path]}, True),
+                ("write_file", write_file, False)
+            )
+        }
+        mock_openai.return_value = MagicMock()
+        
+        config_data = self.create_deepseek_config()
+        config_data['tools'] = {'cacheable': ['read_file']}
+        config_path = self.create_temp_config(config_data)
+        
+        def call(name, args):
+            tool_call = SimpleNamespace(id=name, function=SimpleNamespace(name=name, arguments=json.dumps(args)))
+            return json.loads(agent.handle_tool_call(tool_call)["content"])
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            
+            assert call("read_file", {"path": "a.txt"}) == {"content": "old"}
+            files["a.txt"] = "changed outside the agent"
+            assert call("read_file", {"path": "a.txt"}) == {"content": "old"}  # Served from the cache
+            
+            call("write_file", {"path": "a.txt", "content": "new"})
+            assert call("read_file", {"path": "a.txt"}) == {"content": "new"}
+        
+        finally:
+            os.unlink(config_path)
+    
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_run_trims_previous_assistant_content(self, mock_openai, mock_discover_tools):
+        """Test a large assistant turn drops the previous turn's text from the history"""
+        def make_response(content, tool_name, arguments):
+            tool_call = MagicMock()
+            tool_call.id = f"call_{tool_name}"
+            tool_call.function.name = tool_name
+            tool_call.function.arguments = arguments
+            response = MagicMock()
+            response.choices[0].message.content = content
+            response.choices[0].message.tool_calls = [tool_call]
+            return response
+        
+        mock_tool = MagicMock()
+        mock_tool.to_openrouter_schema.return_value = {"type": "function", "function": {"name": "noop"}}
+        mock_tool.execute.return_value = {"ok": True}
+        mock_discover_tools.return_value = {"noop": mock_tool}
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.side_effect = [
+            make_response("first", "noop", "{}"),
+            make_response("x" * 100, "mark_task_complete", '{"completion_message": "done"}')
+        ]
+        mock_openai.return_value = mock_client
+        
+        config_data = self.create_deepseek_config()
+        config_data['agent']['content_trim_threshold'] = 50
+        config_path = self.create_temp_config(config_data)
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            result = agent.run("Hello")
+            
+            assert result == "first\n\n" + "x" * 100 + "\n\ndone"
+            history = mock_client.chat.completions.create.call_args.kwargs['messages']
+            assert [m["content"] for m in history if m["role"] == "assistant"] == [None, "x" * 100]
+        
+        finally:
+            os.unlink(config_path)
+
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_stream_llm_stops_after_task_completion(self, mock_openai, mock_discover_tools):
+        """Test streaming closes the response once mark_task_complete arguments are complete"""
+        def chunk(content=None, tool_call=None):
+            delta = SimpleNamespace(content=content, tool_calls=[tool_call] if tool_call else None)
+            return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+        
+        def tool_delta(call_id=None, name=None, arguments=None):
+            return SimpleNamespace(index=0, id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+        
+        chunks = [
+            chunk(content="Done."),
+            chunk(tool_call=tool_delta("call_1", "mark_task_complete", '{"task_summary": "s", ')),
+            chunk(tool_call=tool_delta(arguments='"completion_message": "All done"}')),
+            chunk(content=" This trailing text should be dropped."),
+            chunk(content=" This chunk should never be read.")
+        ]
+        consumed = []
+        
+        class FakeStream:
+            def __iter__(self):
+                for c in chunks:
+                    consumed.append(c)
+                    yield c
+            close = MagicMock()
+        
+        stream = FakeStream()
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = stream
+        mock_openai.return_value = mock_client
+        mock_discover_tools.return_value = {}
+        
+        config_data = self.create_deepseek_config()
+        config_data['agent']['stream'] = True
+        config_path = self.create_temp_config(config_data)
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            
+            response = agent.stream_llm([{"role": "user", "content": "Hello"}])
+            
+            message = response.choices[0].message
+            assert message.content == "Done."
+            assert message.tool_calls[0].id == "call_1"
+            assert message.tool_calls[0].function.name == "mark_task_complete"
+            assert json.loads(message.tool_calls[0].function.arguments)["completion_message"] == "All done"
+            assert len(consumed) == 4
+            FakeStream.close.assert_called_once()
+            assert mock_client.chat.completions.create.call_args[1]['stream'] is True
+            
+        finally:
+            os.unlink(config_path)
+    
+    @patch('agent.discover_tools')
+    @patch('provider_factory.OpenAI')
+    def test_stream_llm_keeps_tool_calls_after_task_completion(self, mock_openai, mock_discover_tools):
+        """Test streaming keeps reading tool calls that follow a complete mark_task_complete call"""
+        def chunk(tool_call=None, content=None):
+            delta = SimpleNamespace(content=content, tool_calls=[tool_call] if tool_call else None)
+            return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+        
+        def tool_delta(index, call_id=None, name=None, arguments=None):
+            return SimpleNamespace(index=index, id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+        
+        chunks = [
+            chunk(tool_delta(0, "call_1", "mark_task_complete", '{"completion_message": "All done"}')),
+            chunk(tool_delta(1, "call_2", "write_file", '{"path": "out.txt", ')),
+            chunk(tool_delta(1, arguments='"content": "hi"}')),
+            chunk(content=" This chunk should never be read.")
+        ]
+        
+        class FakeStream:
+            def __iter__(self):
+                return iter(chunks)
+            close = MagicMock()
+        
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = FakeStream()
+        mock_openai.return_value = mock_client
+        mock_discover_tools.return_value = {}
+        
+        config_data = self.create_deepseek_config()
+        config_data['agent']['stream'] = True
+        config_path = self.create_temp_config(config_data)
+        
+        try:
+            agent = UniversalAgent(config_path, silent=True)
+            
+            response = agent.stream_llm([{"role": "user", "content": "Hello"}])
+            
+            message = response.choices[0].message
+            assert message.content is None
+            assert [tool_call.function.name for tool_call in message.tool_calls] == ["mark_task_complete", "write_file"]
+            assert json.loads(message.tool_calls[1].function.arguments) == {"path": "out.txt", "content": "hi"}
+            FakeStream.close.assert_called_once()
+            
+        finally:
+            os.unlink(config_path)
 
 
 class TestOpenRouterAgentBackwardCompatibility:
@@ -1,10 +1,30 @@
 import os
+import json
 import importlib
 from typing import Dict, List
 from .base_tool import BaseTool
 
+# Discovered tools keyed by the config they were built from; every agent in an
+# orchestrator run shares the same config, so discovery happens once per process
+_DISCOVERY_CACHE: Dict[str, Dict[str, BaseTool]] = {}
+
 def discover_tools(config: dict = None, silent: bool = False) -> Dict[str, BaseTool]:
-    """Automatically discover and load all tools from the tools directory"""
+    """Automatically discover and load all tools from the tools directory.
+    
+    Results are reused for identical configs unless a tool sets shareable = False.
+    """
+    cache_key = json.dumps(config or {}, sort_keys=True, default=str)
+    cached = _DISCOVERY_CACHE.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+    
+    tools = _load_tools(config, silent)
+    if all(tool.shareable for tool in tools.values()):
+        _DISCOVERY_CACHE[cache_key] = tools
+    return dict(tools)
+
+def _load_tools(config: dict = None, silent: bool = False) -> Dict[str, BaseTool]:
+    """Import every tool module and instantiate its tool classes"""
     tools = {}
     
     # Get the tools directory path
@@ -4,6 +4,13 @@ from typing import Dict, Any, List
 class BaseTool(ABC):
     """Base class for all tools"""
     
+    # Instances may be shared between agents; stateful tools set this to False
+    shareable = True
+    
+    # Tools that only read state may run concurrently within one assistant turn;
+    # a batch containing any other tool runs in call order
+    read_only = False
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -2,6 +2,8 @@ from .base_tool import BaseTool
 import os
 
 class ReadFileTool(BaseTool):
+    read_only = True
+    
     def __init__(self, config: dict):
         self.config = config
     
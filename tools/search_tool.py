@@ -5,6 +5,8 @@ import requests
 import json
 
 class SearchTool(BaseTool):
+    read_only = True
+    
     def __init__(self, config: dict):
         self.config = config
     